@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class Action(Enum):
+    FOLD = "fold"
+    CHECK = "check"
+    CALL = "call"
+    BET = "bet"
+    RAISE = "raise"
+    ALL_IN = "all in"
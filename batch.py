@@ -0,0 +1,111 @@
+import numpy as np
+from evaluator import (
+    FLUSHES7,
+    RANK_BITS,
+    SCORE_SHIFT,
+    STRAIGHTS,
+    Score,
+    pack,
+    top_ranks,
+)
+from poker import Poker
+
+
+def _top_table(n):
+    table = np.zeros(1 << 13, dtype=np.int64)
+    for mask in range(1 << 13):
+        ranks = top_ranks(mask, n)
+        table[mask] = pack(0, ranks + [0] * (n - len(ranks))) >> RANK_BITS * (5 - n)
+    return table
+
+
+def _straight_table():
+    return np.array(
+        [
+            pack(Score.STRAIGH.value, [high - i for i in range(5)]) if high else 0
+            for high in STRAIGHTS
+        ],
+        dtype=np.int64,
+    )
+
+
+VALUE_BIT = np.array([0, 0] + [1 << rank for rank in range(13)], dtype=np.int64)
+FLUSH_TABLE = np.array(FLUSHES7, dtype=np.int64)
+STRAIGHT_TABLE = _straight_table()
+HIGHEST = np.array(
+    [mask.bit_length() + 1 if mask else 0 for mask in range(1 << 13)], dtype=np.int64
+)
+TOP2, TOP3, TOP5 = _top_table(2), _top_table(3), _top_table(5)
+TOP2_BITS = np.array(
+    [sum(1 << (rank - 2) for rank in top_ranks(mask, 2)) for mask in range(1 << 13)],
+    dtype=np.int64,
+)
+
+
+def to_array(hands):
+    return np.array([Poker.encode(hand) for hand in hands], dtype=np.int64)
+
+
+def _score(score):
+    return score << SCORE_SHIFT
+
+
+def _evaluate_chunk(cards):
+    # One bit per card, laid out as four 13-bit rank masks, one per suit
+    hand = np.left_shift(1, (cards & 3) * 13 + (cards >> 2)).sum(axis=1)
+    a, b, c, d = ((hand >> (13 * suit)) & 0x1FFF for suit in range(4))
+    flush = np.maximum(
+        np.maximum(FLUSH_TABLE[a], FLUSH_TABLE[b]),
+        np.maximum(FLUSH_TABLE[c], FLUSH_TABLE[d]),
+    )
+
+    # Bit-sliced sum of the suit masks gives the multiplicity of every rank
+    ones = a ^ b ^ c ^ d
+    carry = (a ^ b) & (c ^ d)
+    twos = (a & b) ^ (c & d) ^ carry
+    quads = a & b & c & d
+    singles = ones & ~twos
+    pairs = twos & ~ones
+    trips = ones & twos
+    ranks_mask = a | b | c | d
+
+    quad = HIGHEST[quads]
+    trip = HIGHEST[trips]
+    return np.select(
+        [
+            flush > 0,
+            quads > 0,
+            (trips > 0) & (((trips & (trips - 1)) | pairs) > 0),
+            STRAIGHT_TABLE[ranks_mask] > 0,
+            trips > 0,
+            (pairs & (pairs - 1)) > 0,
+            pairs > 0,
+        ],
+        [
+            flush,
+            _score(Score.POKER.value)
+            | quad << 16
+            | HIGHEST[ranks_mask & ~VALUE_BIT[quad]] << 12,
+            _score(Score.FULL_HOUSE.value)
+            | trip << 16
+            | HIGHEST[(trips & ~VALUE_BIT[trip]) | pairs] << 12,
+            STRAIGHT_TABLE[ranks_mask],
+            _score(Score.THREE_OF_A_KIND.value) | trip << 16 | TOP2[singles] << 8,
+            _score(Score.DOUBLE_PAIR.value)
+            | TOP2[pairs] << 12
+            | HIGHEST[ranks_mask & ~TOP2_BITS[pairs]] << 8,
+            _score(Score.PAIR.value) | HIGHEST[pairs] << 16 | TOP3[singles] << 4,
+        ],
+        TOP5[singles],
+    )
+
+
+def evaluate_batch(cards, chunk_size=100000):
+    cards = np.asarray(cards, dtype=np.int64)
+    assert cards.ndim == 2 and 5 <= cards.shape[1] <= 7
+    strengths = np.empty(len(cards), dtype=np.int64)
+    for start in range(0, len(cards), chunk_size):
+        strengths[start : start + chunk_size] = _evaluate_chunk(
+            cards[start : start + chunk_size]
+        )
+    return strengths, strengths >> SCORE_SHIFT
@@ -0,0 +1,137 @@
+import argparse
+import json
+import random
+import sys
+import time
+from evaluator import evaluate5, evaluate7
+from player import Player
+from poker import Poker, Deck
+from pot import Pot
+from round import Round
+from strategy import CallingStation, RandomStrategy
+from table import Table
+
+SEED = 1234
+
+
+def _sample_hands(size, count):
+    rng = random.Random(SEED)
+    return [rng.sample(range(52), size) for _ in range(count)]
+
+
+def bench_evaluate5(count=100000):
+    hands = _sample_hands(5, count)
+    start = time.perf_counter()
+    for hand in hands:
+        evaluate5(hand)
+    return count, time.perf_counter() - start
+
+
+def bench_evaluate7(count=100000):
+    hands = _sample_hands(7, count)
+    start = time.perf_counter()
+    for hand in hands:
+        evaluate7(hand)
+    return count, time.perf_counter() - start
+
+
+def bench_deal(count=50000, players=6):
+    random.seed(SEED)
+    seats = [Player(str(i)) for i in range(players)]
+    deck = Deck()
+    start = time.perf_counter()
+    for _ in range(count):
+        deck.reset()
+        Poker.deal(seats, deck=deck)
+        deck.burn()
+        deck.deal(3)
+    return count, time.perf_counter() - start
+
+
+def bench_side_pots(count=20000, players=10):
+    rng = random.Random(SEED)
+    tables = []
+    for _ in range(count):
+        seats = [Player(str(i), money=0) for i in range(players)]
+        Table.seat(seats)
+        contributions = [rng.randint(1, 50) * 10 for _ in seats]
+        strengths = {player: rng.randint(0, 1 << 24) for player in seats}
+        tables.append((seats, contributions, strengths))
+    start = time.perf_counter()
+    for seats, contributions, strengths in tables:
+        pot = Pot(seats)
+        for player, amount in zip(seats, contributions):
+            pot.add(player, amount)
+        pot.payouts(strengths)
+    return count, time.perf_counter() - start
+
+
+def bench_hands(count=300, players=6):
+    random.seed(SEED)
+    seats = [
+        Player(str(i), strategy=(RandomStrategy if i % 2 else CallingStation)(SEED + i))
+        for i in range(players)
+    ]
+    deck = Deck()
+    start = time.perf_counter()
+    for hand in range(count):
+        for player in seats:
+            player.money = 1000
+        round = Round(seats, dealer=seats[hand % players], deck=deck)
+        round.play()
+    return count, time.perf_counter() - start
+
+
+BENCHMARKS = {
+    "evaluate5": bench_evaluate5,
+    "evaluate7": bench_evaluate7,
+    "deal": bench_deal,
+    "side_pots": bench_side_pots,
+    "hands_2_players": lambda: bench_hands(players=2),
+    "hands_6_players": lambda: bench_hands(players=6),
+    "hands_10_players": lambda: bench_hands(players=10),
+}
+
+
+def run(names=None, repeat=3):
+    results = {}
+    for name in names or BENCHMARKS:
+        best = 0
+        for _ in range(repeat):
+            count, seconds = BENCHMARKS[name]()
+            best = max(best, count / seconds)
+        results[name] = best
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = {}
+    for name, rate in results.items():
+        if name in baseline and rate < baseline[name] * (1 - threshold):
+            regressions[name] = (baseline[name], rate)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput benchmarks (ops/second)")
+    parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    arguments = parser.parse_args()
+    unknown = set(arguments.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(arguments.names, arguments.repeat)
+    print(json.dumps(results, indent=2))
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if arguments.baseline:
+        with open(arguments.baseline) as file:
+            regressions = compare(results, json.load(file), arguments.threshold)
+        for name, (before, after) in regressions.items():
+            print(f"{name} regressed: {before:.0f}/s -> {after:.0f}/s", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
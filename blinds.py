@@ -0,0 +1,24 @@
+class BlindSchedule:
+    def __init__(self, levels, hands_per_level=None, seconds_per_level=None):
+        assert levels and (hands_per_level or seconds_per_level)
+        self.levels = list(levels)
+        self.hands_per_level = hands_per_level
+        self.seconds_per_level = seconds_per_level
+
+    @classmethod
+    def doubling(cls, small_blind=10, hands_per_level=None, seconds_per_level=None):
+        return cls(
+            [small_blind * 2**level for level in range(40)],
+            hands_per_level=hands_per_level,
+            seconds_per_level=seconds_per_level,
+        )
+
+    def level(self, hands=0, seconds=0):
+        if self.seconds_per_level:
+            level = int(seconds // self.seconds_per_level)
+        else:
+            level = hands // self.hands_per_level
+        return min(level, len(self.levels) - 1)
+
+    def small_blind(self, hands=0, seconds=0):
+        return self.levels[self.level(hands, seconds)]
@@ -0,0 +1,554 @@
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from multiprocessing.shared_memory import SharedMemory
+from random import Random
+import numpy as np
+from action import Action
+from batch import evaluate_batch
+from player import legal_actions
+from poker import Poker
+from preflop import HAND_CLASSES, class_cards, hand_class
+from strategy import Strategy
+
+# Stack, blind and bet sizes are in abstract chips. bet_sizes holds the fixed
+# sizes of each betting street played before the showdown, cap is the number
+# of bets allowed per street and buckets the card buckets per street.
+Abstraction = namedtuple(
+    "Abstraction", ["stack", "small_blind", "bet_sizes", "cap", "buckets"]
+)
+LIMIT = Abstraction(
+    stack=200,
+    small_blind=1,
+    bet_sizes=((2,), (2,), (4,), (4,)),
+    cap=4,
+    buckets=(8, 8, 8, 8),
+)
+
+# Abstract action slots, the fixed bet or raise sizes come after these
+MOVES = [Action.FOLD, Action.CHECK, Action.CALL, Action.ALL_IN]
+DECISION, FOLD, SHOWDOWN = range(3)
+SUBSTITUTES = {
+    Action.FOLD: Action.CHECK,
+    Action.CALL: Action.ALL_IN,
+    Action.BET: Action.ALL_IN,
+    Action.RAISE: Action.ALL_IN,
+    Action.ALL_IN: Action.CALL,
+}
+BOARD_CARDS = [0, 3, 4, 5]
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.int64)
+CONTAINS = np.array([(COMBOS == card).any(axis=1) for card in range(52)])
+CLASS_OF = [[hand_class(Poker.decode([a, b])) for b in range(52)] for a in range(52)]
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cfr.npz")
+
+# Set once per worker process by the pool initializer: the worker's own solver
+# and the shared regret and strategy sums that its batches update in place
+_job = {}
+
+
+class BettingTree:
+    def __init__(self, abstraction):
+        self.abstraction = abstraction
+        self.slots = len(MOVES) + max(len(sizes) for sizes in abstraction.bet_sizes)
+        self.players, self.streets, self.kinds = [], [], []
+        self.contributions, self.children, self.rows = [], [], []
+        self.decisions = 0
+        small_blind = abstraction.small_blind
+        stack = abstraction.stack
+        self._street(
+            0, [small_blind, 2 * small_blind], [small_blind, 2 * small_blind], stack
+        )
+        self.players = np.array(self.players, dtype=np.int8)
+        self.streets = np.array(self.streets, dtype=np.int8)
+        self.kinds = np.array(self.kinds, dtype=np.int8)
+        self.contributions = np.array(self.contributions, dtype=np.int64)
+        self.children = np.array(self.children, dtype=np.int32)
+        self.rows = np.array(self.rows, dtype=np.int32)
+        self.bucket_count = max(abstraction.buckets)
+        # Plain lists for the traversal, numpy indexing is slow one item at a time
+        self.nodes = list(
+            zip(
+                self.kinds.tolist(),
+                self.players.tolist(),
+                self.streets.tolist(),
+                self.rows.tolist(),
+                self.contributions.tolist(),
+            )
+        )
+        self.moves = [
+            [(slot, int(child)) for slot, child in enumerate(row) if child >= 0]
+            for row in self.children.tolist()
+        ]
+
+    def _node(self, player, street, kind, contributions):
+        self.players.append(player)
+        self.streets.append(street)
+        self.kinds.append(kind)
+        self.contributions.append(list(contributions))
+        self.children.append([-1] * self.slots)
+        self.rows.append(self.decisions if kind == DECISION else -1)
+        self.decisions += kind == DECISION
+        return len(self.kinds) - 1
+
+    def _street(self, street, bets, contributions, stack):
+        stacks = [stack - contribution for contribution in contributions]
+        # The big blind is the first preflop bet
+        count = 1 if street == 0 else 0
+        return self._decide(street, 0, bets, contributions, stacks, set(), count)
+
+    def _decide(self, street, player, bets, contributions, stacks, calling, count):
+        node = self._node(player, street, DECISION, contributions)
+        turn_bet, player_bet = max(bets), bets[player]
+        legal = legal_actions(stacks[player], turn_bet, player_bet)
+        moves = []
+        for action in (Action.FOLD, Action.CHECK, Action.CALL):
+            if action in legal:
+                moves.append((MOVES.index(action), action, turn_bet - player_bet))
+        raise_action = Action.BET if Action.BET in legal else Action.RAISE
+        if raise_action in legal and count < self.abstraction.cap:
+            for index, size in enumerate(self.abstraction.bet_sizes[street]):
+                chips = turn_bet - player_bet + size
+                if chips < stacks[player]:
+                    moves.append((len(MOVES) + index, raise_action, chips))
+                elif Action.ALL_IN in legal:
+                    moves.append((MOVES.index(Action.ALL_IN), Action.ALL_IN, 0))
+        if (
+            Action.ALL_IN in legal
+            and Action.CALL not in legal
+            and turn_bet > player_bet
+        ):
+            moves.append((MOVES.index(Action.ALL_IN), Action.ALL_IN, 0))
+
+        for slot, action, chips in moves:
+            if self.children[node][slot] >= 0:
+                continue
+            self.children[node][slot] = self._apply(
+                street,
+                player,
+                bets,
+                contributions,
+                stacks,
+                calling,
+                count,
+                action,
+                chips,
+            )
+        return node
+
+    def _apply(
+        self, street, player, bets, contributions, stacks, calling, count, action, chips
+    ):
+        # Follows PokerTurn.do for two players
+        if action == Action.FOLD:
+            node = self._node(player, street, FOLD, contributions)
+            return node
+        if action == Action.ALL_IN:
+            chips = stacks[player]
+        turn_bet = max(bets)
+        bets, contributions, stacks = list(bets), list(contributions), list(stacks)
+        bets[player] += chips
+        contributions[player] += chips
+        stacks[player] -= chips
+        all_in = {seat for seat in (0, 1) if not stacks[seat]}
+        calling = set(calling) | all_in
+        if action in (Action.CHECK, Action.CALL) or bets[player] <= turn_bet:
+            calling.add(player)
+        if bets[player] > turn_bet:
+            calling = {player} | all_in
+            count += 1
+
+        even = bets[0] == bets[1]
+        if len(calling) == 2 or (even and 2 - len(all_in) < 2):
+            if all_in or street + 1 == len(self.abstraction.bet_sizes):
+                return self._node(player, street, SHOWDOWN, contributions)
+            return self._street(
+                street + 1, [0, 0], contributions, self.abstraction.stack
+            )
+        following = 1 - player if stacks[1 - player] else player
+        return self._decide(
+            street, following, bets, contributions, stacks, calling, count
+        )
+
+
+def _preflop_buckets(buckets, samples=2000, seed=0):
+    # Starting hand classes by equity against a random hand, cut into buckets
+    # holding the same number of combos
+    rng = np.random.default_rng(seed)
+    equities = np.empty(HAND_CLASSES)
+    for index in range(HAND_CLASSES):
+        hole = Poker.encode(class_cards(index))
+        deck = np.array([card for card in range(52) if card not in hole])
+        drawn = deck[rng.random((samples, len(deck))).argsort(axis=1)[:, :7]]
+        board = drawn[:, 2:]
+        mine, _ = evaluate_batch(np.hstack([np.tile(hole, (samples, 1)), board]))
+        theirs, _ = evaluate_batch(np.hstack([drawn[:, :2], board]))
+        equities[index] = ((mine > theirs) + 0.5 * (mine == theirs)).mean()
+    combos = np.array(
+        [
+            6 if row == column else 4 if row > column else 12
+            for row, column in (divmod(index, 13) for index in range(HAND_CLASSES))
+        ]
+    )
+    order = np.argsort(equities)
+    below = np.cumsum(combos[order]) - combos[order] / 2
+    result = np.empty(HAND_CLASSES, dtype=np.int64)
+    result[order] = np.minimum(below * buckets // combos.sum(), buckets - 1)
+    return result
+
+
+def _strength_buckets(holes, board, buckets):
+    # Hand strength: the share of the opponent's possible hands each hole beats,
+    # also returning the strengths themselves for the showdown
+    live = ~CONTAINS[board].any(axis=0)
+    count = int(live.sum())
+    cards = np.hstack(
+        [np.vstack([COMBOS[live], holes]), np.tile(board, (count + len(holes), 1))]
+    )
+    strengths, _ = evaluate_batch(cards)
+    others, mine = strengths[:count], strengths[count:]
+    result = []
+    for hole, strength in zip(holes, mine.tolist()):
+        against = others[~(CONTAINS[hole[0]] | CONTAINS[hole[1]])[live]]
+        beaten = (against < strength).sum() + 0.5 * (against == strength).sum()
+        share = beaten / len(against)
+        result.append(min(int(share * buckets), buckets - 1))
+    return result, mine.tolist()
+
+
+def deal_buckets(abstraction, preflop, cards):
+    # cards are the two hole cards of each player followed by the five board cards
+    holes = [cards[:2], cards[2:4]]
+    board = cards[4:]
+    buckets = [[int(preflop[CLASS_OF[hole[0]][hole[1]]])] for hole in holes]
+    for street, size in enumerate(abstraction.buckets[1:], 1):
+        street_buckets, strengths = _strength_buckets(
+            holes, board[: BOARD_CARDS[street]], size
+        )
+        for player, bucket in enumerate(street_buckets):
+            buckets[player].append(bucket)
+    if len(abstraction.buckets) < 4:
+        _, strengths = _strength_buckets(holes, board, 1)
+    return buckets, strengths
+
+
+def _strategy(regrets, base, moves):
+    positive = [regrets[base + slot] for slot, _ in moves]
+    total = sum(positive)
+    if total > 0:
+        return [regret / total for regret in positive]
+    return [1 / len(moves)] * len(moves)
+
+
+def _traverse(tree, regrets, totals, node, traverser, buckets, strengths, weight, rng):
+    kind, player, street, row, contributions = tree.nodes[node]
+    if kind != DECISION:
+        if kind == FOLD:
+            return (
+                -contributions[traverser]
+                if player == traverser
+                else contributions[1 - traverser]
+            )
+        stake = min(contributions)
+        mine, theirs = strengths[traverser], strengths[1 - traverser]
+        return stake if mine > theirs else -stake if mine < theirs else 0
+
+    base = (row * tree.bucket_count + buckets[player][street]) * tree.slots
+    moves = tree.moves[node]
+    strategy = _strategy(regrets, base, moves)
+
+    if player != traverser:
+        # External sampling: one opponent action, whose strategy is averaged
+        for (slot, _), probability in zip(moves, strategy):
+            totals[base + slot] += weight * probability
+        pick, threshold = 0, rng.random()
+        while pick < len(moves) - 1 and threshold >= strategy[pick]:
+            threshold -= strategy[pick]
+            pick += 1
+        return _traverse(
+            tree,
+            regrets,
+            totals,
+            moves[pick][1],
+            traverser,
+            buckets,
+            strengths,
+            weight,
+            rng,
+        )
+
+    values = [
+        _traverse(
+            tree, regrets, totals, child, traverser, buckets, strengths, weight, rng
+        )
+        for _, child in moves
+    ]
+    value = sum(p * v for p, v in zip(strategy, values))
+    for (slot, _), action_value in zip(moves, values):
+        # CFR+: regrets are floored at zero after every update
+        regrets[base + slot] = max(regrets[base + slot] + action_value - value, 0.0)
+    return value
+
+
+class Solver:
+    def __init__(self, abstraction=LIMIT, preflop=None):
+        self.abstraction = Abstraction(
+            abstraction.stack,
+            abstraction.small_blind,
+            tuple(tuple(sizes) for sizes in abstraction.bet_sizes),
+            abstraction.cap,
+            tuple(abstraction.buckets),
+        )
+        assert len(self.abstraction.buckets) == len(self.abstraction.bet_sizes) <= 4
+        self.tree = BettingTree(self.abstraction)
+        self.preflop = (
+            _preflop_buckets(self.abstraction.buckets[0])
+            if preflop is None
+            else preflop
+        )
+        self.shape = (self.tree.decisions, self.tree.bucket_count, self.tree.slots)
+        self.regrets = np.zeros(self.shape)
+        self.totals = np.zeros(self.shape)
+        self.iterations = 0
+        self.seconds = 0.0
+
+    def iterate(self, iterations, seed=0, regrets=None, totals=None):
+        # Runs in place over flat views, so workers can share the arrays
+        regrets = self.regrets.reshape(-1) if regrets is None else regrets
+        totals = self.totals.reshape(-1) if totals is None else totals
+        rng = Random(seed)
+        for iteration in range(iterations):
+            cards = rng.sample(range(52), 9)
+            buckets, strengths = deal_buckets(self.abstraction, self.preflop, cards)
+            # Linear averaging weighs later iterations more
+            weight = self.iterations + iteration + 1
+            for traverser in (0, 1):
+                _traverse(
+                    self.tree,
+                    regrets,
+                    totals,
+                    0,
+                    traverser,
+                    buckets,
+                    strengths,
+                    weight,
+                    rng,
+                )
+        self.iterations += iterations
+
+    def train(
+        self,
+        iterations,
+        workers=None,
+        batch_size=500,
+        checkpoint=None,
+        checkpoint_every=50000,
+        seed=0,
+    ):
+        workers = workers or os.cpu_count()
+        blocks = [SharedMemory(create=True, size=self.regrets.nbytes) for _ in range(2)]
+        try:
+            for block, array in zip(blocks, (self.regrets, self.totals)):
+                np.ndarray(self.shape, buffer=block.buf)[:] = array
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(
+                    self.abstraction,
+                    self.preflop,
+                    [block.name for block in blocks],
+                ),
+            ) as executor:
+                done = 0
+                while done < iterations:
+                    wave = min(checkpoint_every, iterations - done)
+                    starts = range(0, wave, batch_size)
+                    start = time.perf_counter()
+                    # Workers update the shared tables in place without locking
+                    list(
+                        executor.map(
+                            _iterate_batch,
+                            [self.iterations + first for first in starts],
+                            [min(batch_size, wave - first) for first in starts],
+                            [
+                                seed * 1000003 + self.iterations + first
+                                for first in starts
+                            ],
+                        )
+                    )
+                    self.seconds += time.perf_counter() - start
+                    done += wave
+                    self.iterations += wave
+                    for block, array in zip(blocks, (self.regrets, self.totals)):
+                        array[:] = np.ndarray(self.shape, buffer=block.buf)
+                    if checkpoint:
+                        self.save(checkpoint)
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        return self
+
+    def average_strategy(self, node, bucket):
+        # Move probabilities over the tree's slots, zero for the illegal ones
+        row = self.tree.rows[node]
+        legal = self.tree.children[node] >= 0
+        total = self.totals[row, bucket] * legal
+        if total.sum() > 0:
+            return total / total.sum()
+        return legal / legal.sum()
+
+    def save(self, path=DEFAULT_PATH):
+        # Written next to the target first, so a crash never leaves half a file
+        partial = f"{path}.partial.npz"
+        np.savez(
+            partial,
+            abstraction=json.dumps(self.abstraction._asdict()),
+            preflop=self.preflop,
+            regrets=self.regrets,
+            totals=self.totals,
+            iterations=self.iterations,
+            seconds=self.seconds,
+        )
+        os.replace(partial, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with np.load(path) as data:
+            abstraction = Abstraction(**json.loads(str(data["abstraction"])))
+            solver = cls(abstraction, preflop=data["preflop"])
+            if data["regrets"].shape != solver.shape:
+                raise ValueError(f"{path} does not match its betting tree")
+            solver.regrets[:] = data["regrets"]
+            solver.totals[:] = data["totals"]
+            solver.iterations = int(data["iterations"])
+            solver.seconds = float(data["seconds"])
+        return solver
+
+
+def _init_worker(abstraction, preflop, names):
+    solver = Solver(abstraction, preflop)
+    blocks = [SharedMemory(name=name) for name in names]
+    _job.update(
+        solver=solver,
+        blocks=blocks,
+        regrets=np.ndarray(solver.shape, buffer=blocks[0].buf).reshape(-1),
+        totals=np.ndarray(solver.shape, buffer=blocks[1].buf).reshape(-1),
+    )
+
+
+def _iterate_batch(first, count, seed):
+    solver = _job["solver"]
+    solver.iterations = first
+    solver.iterate(count, seed, _job["regrets"], _job["totals"])
+    return count
+
+
+class CFRStrategy(Strategy):
+    # Plays a solved abstraction heads-up, mapping the real hand to the nearest
+    # node; with more players it just checks or calls
+    def __init__(self, solver=None, seed=None):
+        super().__init__(seed)
+        self.solver = solver or Solver.load()
+        self.amount = 1
+        tree = self.solver.tree
+        self.nodes = {}
+        for node in np.flatnonzero(tree.kinds == DECISION).tolist():
+            key = (int(tree.streets[node]), int(tree.players[node]))
+            self.nodes.setdefault(key, []).append(node)
+        self.nodes = {key: np.array(nodes) for key, nodes in self.nodes.items()}
+
+    def _node(self, street, seat, mine, theirs):
+        tree = self.solver.tree
+        nodes = self.nodes.get((street, seat))
+        if nodes is None:
+            return None
+        contributions = tree.contributions[nodes]
+        facing = contributions[:, 1 - seat] > contributions[:, seat]
+        distance = (
+            np.abs(contributions[:, seat] - mine)
+            + np.abs(contributions[:, 1 - seat] - theirs)
+            + 1e9 * (facing != (theirs > mine))
+        )
+        return int(nodes[np.argmin(distance)])
+
+    def choose_action(self, round, player, actions):
+        passive = next(
+            (action for action in (Action.CHECK, Action.CALL) if action in actions),
+            Action.FOLD if Action.FOLD in actions else actions[0],
+        )
+        if len(round.players) != 2:
+            return passive
+        abstraction = self.solver.abstraction
+        street = round.turns.index(round.current_turn)
+        if street >= len(abstraction.bet_sizes):
+            return passive
+        seat = 0 if player is round.small_blind_player else 1
+        opponent = next(other for other in round.players if other is not player)
+        scale = abstraction.small_blind / round.small_blind
+        node = self._node(
+            street,
+            seat,
+            round.get_total_bet_of_player(player) * scale,
+            round.get_total_bet_of_player(opponent) * scale,
+        )
+        if node is None:
+            return passive
+
+        hole = list(player.card_ids)
+        board = Poker.encode(round.shared_cards)
+        if street == 0:
+            bucket = int(self.solver.preflop[CLASS_OF[hole[0]][hole[1]]])
+        else:
+            buckets, _ = _strength_buckets([hole], board, abstraction.buckets[street])
+            bucket = buckets[0]
+        probabilities = self.solver.average_strategy(node, bucket)
+        slot = self.rng.choices(range(len(probabilities)), probabilities)[0]
+        if slot < len(MOVES):
+            action = MOVES[slot]
+        else:
+            action = Action.BET if Action.BET in actions else Action.RAISE
+            size = abstraction.bet_sizes[street][slot - len(MOVES)]
+            self.amount = max(int(size / scale + 0.5), 1)
+        # Short stacks turn calls and raises into all ins, and the reverse
+        for choice in (action, SUBSTITUTES.get(action)):
+            if choice in actions:
+                return choice
+        return passive
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CFR+ solver for heads-up play")
+    parser.add_argument("--checkpoint", default=DEFAULT_PATH)
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--every", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--resume", action="store_true")
+    arguments = parser.parse_args()
+
+    solver = Solver.load(arguments.checkpoint) if arguments.resume else Solver()
+    print(
+        f"{solver.tree.decisions} decision nodes, {solver.regrets.nbytes >> 20} MB "
+        "per table"
+    )
+    solver.train(
+        arguments.iterations,
+        workers=arguments.workers,
+        checkpoint=arguments.checkpoint,
+        checkpoint_every=arguments.every,
+        seed=arguments.seed,
+    )
+    print(
+        f"{solver.iterations} iterations, "
+        f"{solver.iterations / solver.seconds:.0f} iterations/s"
+    )
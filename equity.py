@@ -0,0 +1,194 @@
+from collections import namedtuple
+from itertools import combinations
+from math import comb, sqrt
+from random import Random
+from evaluator import StrengthCache, evaluate7
+from poker import Poker, Deck
+from ranges import canonical_subsets, stabilizer
+
+# Enough for every opponent hand on the flop
+EXACT_CACHE_SIZE = 1 << 18
+
+Equity = namedtuple("Equity", ["win", "tie", "lose", "equity", "stderr", "samples"])
+
+
+def _remaining_deck(hands, board):
+    known = [card for hand in hands for card in hand] + list(board)
+    assert len(set(known)) == len(known), "duplicate cards"
+    return [card for card in range(52) if card not in known]
+
+
+def _results(wins, ties, shares, squares, samples, exact=False):
+    results = []
+    for win, tie, share, square in zip(wins, ties, shares, squares):
+        mean = share / samples
+        variance = max(square / samples - mean * mean, 0)
+        results.append(
+            Equity(
+                win=win / samples,
+                tie=tie / samples,
+                lose=(samples - win - tie) / samples,
+                equity=mean,
+                stderr=0.0 if exact else sqrt(variance / samples),
+                samples=samples,
+            )
+        )
+    return results
+
+
+def _tally(strengths, wins, ties, shares, squares, weight=1):
+    best = max(strengths)
+    winners = strengths.count(best)
+    share = 1 / winners
+    for i in range(len(wins)):
+        if strengths[i] == best:
+            shares[i] += share * weight
+            squares[i] += share * share * weight
+            if winners == 1:
+                wins[i] += weight
+            else:
+                ties[i] += weight
+
+
+def runouts(deck_size, missing, opponents, hole_cards=2):
+    count = comb(deck_size, missing)
+    for o in range(opponents):
+        count *= comb(deck_size - missing - hole_cards * o, hole_cards)
+    return count
+
+
+def _opponent_hands(holes, opponents, used=frozenset()):
+    if not opponents:
+        yield ()
+        return
+    for hole in holes:
+        if not used.isdisjoint(hole):
+            continue
+        for rest in _opponent_hands(holes, opponents - 1, used | set(hole)):
+            yield (hole,) + rest
+
+
+def exact_equity(hands, board=(), opponents=0, hole_cards=2, evaluate=evaluate7):
+    hands = [Poker.encode(hand) for hand in hands]
+    board = Poker.encode(board)
+    assert len(hands) + opponents >= 2 and len(board) <= 5
+    deck = _remaining_deck(hands, board)
+    missing = 5 - len(board)
+    known = len(hands)
+    wins, ties, shares, squares = [0] * known, [0] * known, [0.0] * known, [0.0] * known
+
+    # Runouts related by a suit relabelling that fixes every hand and the board
+    # score alike, so one runout per orbit is played, weighted by the orbit size
+    symmetries = stabilizer(board, *hands)
+    # An opponent's hole cards and the board come up again as another split of
+    # the same cards on later runouts, so those hands are scored through a cache
+    score = StrengthCache(EXACT_CACHE_SIZE, evaluate, hole_cards).evaluate
+    samples = 0
+    for runout, weight in canonical_subsets(deck, missing, symmetries):
+        full_board = board + list(runout)
+        # Every seat is scored once per board, opponent hands become lookups
+        strengths = [evaluate(hand + full_board) for hand in hands]
+        if not opponents:
+            _tally(strengths, wins, ties, shares, squares, weight)
+            samples += weight
+            continue
+        rest = [card for card in deck if card not in runout]
+        hole_strengths = {
+            hole: score(list(hole) + full_board)
+            for hole in combinations(rest, hole_cards)
+        }
+        for opponent_hands in _opponent_hands(list(hole_strengths), opponents):
+            _tally(
+                strengths + [hole_strengths[hole] for hole in opponent_hands],
+                wins,
+                ties,
+                shares,
+                squares,
+                weight,
+            )
+            samples += weight
+
+    return _results(wins, ties, shares, squares, samples, exact=True)
+
+
+def monte_carlo_equity(
+    hands,
+    board=(),
+    opponents=0,
+    iterations=10000,
+    target_stderr=None,
+    seed=None,
+    hole_cards=2,
+    evaluate=evaluate7,
+):
+    deck = Deck(
+        rng=Random(seed),
+        dead_cards=[card for hand in hands for card in hand] + list(board),
+    )
+    hands = [Poker.encode(hand) for hand in hands]
+    board = Poker.encode(board)
+    assert len(hands) + opponents >= 2 and len(board) <= 5
+    missing = 5 - len(board)
+    assert missing + hole_cards * opponents <= len(deck)
+
+    # One reusable buffer per seat, the board part is overwritten in place
+    seats = [
+        hand + board + [0] * missing for hand in hands + [[0] * hole_cards] * opponents
+    ]
+    known = len(hands)
+    strengths = [0] * len(seats)
+    wins, ties, shares, squares = [0] * known, [0] * known, [0.0] * known, [0.0] * known
+
+    samples = 0
+    check_every = 1000
+    while samples < iterations:
+        deck.reset()
+        for i in range(missing):
+            card = deck.draw_id()
+            for seat in seats:
+                seat[hole_cards + len(board) + i] = card
+        for seat in seats[known:]:
+            for j in range(hole_cards):
+                seat[j] = deck.draw_id()
+
+        for i, seat in enumerate(seats):
+            strengths[i] = evaluate(seat)
+        _tally(strengths, wins, ties, shares, squares)
+        samples += 1
+        if target_stderr and samples % check_every == 0:
+            results = _results(wins, ties, shares, squares, samples)
+            if max(result.stderr for result in results) <= target_stderr:
+                return results
+
+    return _results(wins, ties, shares, squares, samples)
+
+
+def equity(
+    hands,
+    board=(),
+    opponents=0,
+    iterations=10000,
+    target_stderr=None,
+    seed=None,
+    hole_cards=2,
+    evaluate=evaluate7,
+):
+    unknown = 52 - hole_cards * len(hands) - len(board)
+    if runouts(unknown, 5 - len(board), opponents, hole_cards) <= iterations:
+        return exact_equity(
+            hands,
+            board=board,
+            opponents=opponents,
+            hole_cards=hole_cards,
+            evaluate=evaluate,
+        )
+    return monte_carlo_equity(
+        hands,
+        board=board,
+        opponents=opponents,
+        iterations=iterations,
+        target_stderr=target_stderr,
+        seed=seed,
+        hole_cards=hole_cards,
+        evaluate=evaluate,
+    )
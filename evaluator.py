@@ -0,0 +1,294 @@
+from collections import Counter, OrderedDict
+from enum import Enum
+from itertools import combinations, combinations_with_replacement
+
+
+class Score(Enum):
+    ROYAL_FLUSH = 9
+    STRAIGHT_FLUSH = 8
+    POKER = 7
+    FULL_HOUSE = 6
+    FLUSH = 5
+    STRAIGH = 4
+    THREE_OF_A_KIND = 3
+    DOUBLE_PAIR = 2
+    PAIR = 1
+    HIGH_CARD = 0
+
+
+COUNT_RANKINGS = {
+    (4, 1): Score.POKER.value,
+    (3, 2): Score.FULL_HOUSE.value,
+    (3, 1, 1): Score.THREE_OF_A_KIND.value,
+    (2, 2, 1): Score.DOUBLE_PAIR.value,
+    (2, 1, 1, 1): Score.PAIR.value,
+    (1, 1, 1, 1, 1): Score.HIGH_CARD.value,
+}
+
+# A card is encoded as rank_index * 4 + suit_index, the position in Poker.DECK
+RANK_BITS = 4
+SCORE_SHIFT = 5 * RANK_BITS
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+CARD_RANK = [card >> 2 for card in range(52)]
+CARD_BIT = [1 << (card >> 2) for card in range(52)]
+CARD_SUIT = [1 << (card & 3) for card in range(52)]
+CARD_PRIME = [PRIMES[card >> 2] for card in range(52)]
+
+
+def pack(score, ranks):
+    strength = score
+    for i in range(5):
+        strength = strength << RANK_BITS | (ranks[i] if i < len(ranks) else 0)
+    return strength
+
+
+def unpack(strength):
+    ranks = tuple(
+        rank
+        for rank in (
+            (strength >> (RANK_BITS * i)) & ((1 << RANK_BITS) - 1)
+            for i in range(4, -1, -1)
+        )
+        if rank
+    )
+    return strength >> SCORE_SHIFT, ranks
+
+
+def straight_flush_score(high):
+    return Score.ROYAL_FLUSH.value if high == 14 else Score.STRAIGHT_FLUSH.value
+
+
+def straight_high(mask):
+    for high in range(12, 3, -1):
+        if mask >> (high - 4) & 0b11111 == 0b11111:
+            return high + 2
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 5
+    return 0
+
+
+def top_ranks(mask, n=5):
+    return [rank + 2 for rank in range(12, -1, -1) if mask >> rank & 1][:n]
+
+
+def rank_hand(ranks, is_flush):
+    groups = Counter(sorted(ranks, reverse=True)).most_common()
+    ranks, counts = zip(*groups)
+    if ranks == (14, 5, 4, 3, 2):
+        ranks = (5, 4, 3, 2, 1)
+    is_straight = len(ranks) == 5 and ranks[0] - ranks[-1] == 4
+    if is_straight and is_flush:
+        return pack(straight_flush_score(ranks[0]), ranks)
+    score = max(
+        COUNT_RANKINGS[counts],
+        Score.STRAIGH.value * is_straight + Score.FLUSH.value * is_flush,
+    )
+    return pack(score, ranks)
+
+
+def _build_tables():
+    flushes = [0] * (1 << 13)
+    unique = [0] * (1 << 13)
+    products = {}
+    for indexes in combinations_with_replacement(range(13), 5):
+        if max(Counter(indexes).values()) > 4:
+            continue
+        ranks = [i + 2 for i in indexes]
+        if len(set(indexes)) == 5:
+            mask = sum(1 << i for i in indexes)
+            flushes[mask] = rank_hand(ranks, is_flush=True)
+            unique[mask] = rank_hand(ranks, is_flush=False)
+        else:
+            product = 1
+            for i in indexes:
+                product *= PRIMES[i]
+            products[product] = rank_hand(ranks, is_flush=False)
+    return flushes, unique, products
+
+
+def _build_mask_tables():
+    straights = [straight_high(mask) for mask in range(1 << 13)]
+    flushes = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") < 5:
+            continue
+        high = straights[mask]
+        if high:
+            flushes[mask] = pack(
+                straight_flush_score(high), [high - i or 14 for i in range(5)]
+            )
+        else:
+            flushes[mask] = pack(Score.FLUSH.value, top_ranks(mask))
+    return straights, flushes
+
+
+FLUSHES, UNIQUE, PRODUCTS = _build_tables()
+STRAIGHTS, FLUSHES7 = _build_mask_tables()
+
+
+def evaluate5(cards):
+    a, b, c, d, e = cards
+    if CARD_SUIT[a] & CARD_SUIT[b] & CARD_SUIT[c] & CARD_SUIT[d] & CARD_SUIT[e]:
+        return FLUSHES[
+            CARD_BIT[a] | CARD_BIT[b] | CARD_BIT[c] | CARD_BIT[d] | CARD_BIT[e]
+        ]
+    strength = UNIQUE[
+        CARD_BIT[a] | CARD_BIT[b] | CARD_BIT[c] | CARD_BIT[d] | CARD_BIT[e]
+    ]
+    if strength:
+        return strength
+    return PRODUCTS[
+        CARD_PRIME[a] * CARD_PRIME[b] * CARD_PRIME[c] * CARD_PRIME[d] * CARD_PRIME[e]
+    ]
+
+
+def evaluate7(cards):
+    suit_masks = [0, 0, 0, 0]
+    counts = [0] * 13
+    for card in cards:
+        suit_masks[card & 3] |= CARD_BIT[card]
+        counts[card >> 2] += 1
+
+    # With at most 7 cards a flush rules out quads and full houses
+    for mask in suit_masks:
+        if FLUSHES7[mask]:
+            return FLUSHES7[mask]
+
+    groups = ([], [], [], [], [])
+    for rank in range(12, -1, -1):
+        groups[counts[rank]].append(rank + 2)
+    _, singles, pairs, trips, quads = groups
+
+    if quads:
+        return pack(
+            Score.POKER.value, [quads[0], max(quads[1:] + trips + pairs + singles)]
+        )
+    if trips and len(trips) + len(pairs) > 1:
+        return pack(Score.FULL_HOUSE.value, [trips[0], max(trips[1:] + pairs)])
+    high = STRAIGHTS[suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3]]
+    if high:
+        return pack(Score.STRAIGH.value, [high - i or 14 for i in range(5)])
+    if trips:
+        return pack(Score.THREE_OF_A_KIND.value, trips + singles[:2])
+    if len(pairs) > 1:
+        return pack(Score.DOUBLE_PAIR.value, pairs[:2] + [max(pairs[2:] + singles)])
+    if pairs:
+        return pack(Score.PAIR.value, pairs + singles[:3])
+    return pack(Score.HIGH_CARD.value, singles[:5])
+
+
+def evaluate(cards):
+    if len(cards) == 5:
+        return evaluate5(cards)
+    return evaluate7(cards)
+
+
+SET_EVALUATORS = {evaluate, evaluate5, evaluate7}
+
+
+def evaluate_omaha(cards):
+    # Exactly two of the four hole cards with exactly three of the board cards
+    hole, board = cards[:4], cards[4:]
+    best = 0
+
+    # A flush needs three board cards and two hole cards of one suit
+    for suit in range(4):
+        board_suited = [card for card in board if card & 3 == suit]
+        if len(board_suited) < 3:
+            continue
+        hole_suited = [card for card in hole if card & 3 == suit]
+        for a, b in combinations(hole_suited, 2):
+            for c, d, e in combinations(board_suited, 3):
+                best = max(
+                    best,
+                    FLUSHES[
+                        CARD_BIT[a]
+                        | CARD_BIT[b]
+                        | CARD_BIT[c]
+                        | CARD_BIT[d]
+                        | CARD_BIT[e]
+                    ],
+                )
+
+    # Otherwise only ranks matter, so picks with the same ranks are scored once
+    hole_picks = {
+        (CARD_BIT[a] | CARD_BIT[b], CARD_PRIME[a] * CARD_PRIME[b])
+        for a, b in combinations(hole, 2)
+    }
+    board_picks = {
+        (
+            CARD_BIT[c] | CARD_BIT[d] | CARD_BIT[e],
+            CARD_PRIME[c] * CARD_PRIME[d] * CARD_PRIME[e],
+        )
+        for c, d, e in combinations(board, 3)
+    }
+    for hole_mask, hole_product in hole_picks:
+        for board_mask, board_product in board_picks:
+            strength = (
+                UNIQUE[hole_mask | board_mask] or PRODUCTS[hole_product * board_product]
+            )
+            if strength > best:
+                best = strength
+    return best
+
+
+def canonical_key(cards, hole_cards=0):
+    # Relabelling suits never changes a strength, so sorting the four suit masks
+    # maps every suit-isomorphic hand to the same key. The first hole_cards cards
+    # get their own bits, for evaluators that treat them apart from the board
+    masks = [0, 0, 0, 0]
+    if hole_cards:
+        for i, card in enumerate(cards):
+            masks[card & 3] |= CARD_BIT[card] << (13 if i < hole_cards else 0)
+    else:
+        for card in cards:
+            masks[card & 3] |= CARD_BIT[card]
+    masks.sort()
+    return masks[0] | masks[1] << 26 | masks[2] << 52 | masks[3] << 78
+
+
+class StrengthCache:
+    def __init__(self, size=1 << 16, evaluate=evaluate, hole_cards=2):
+        self.size = size
+        self.evaluator = evaluate
+        # Hold'em and draw evaluators score all the cards as one set
+        self.hole_cards = 0 if evaluate in SET_EVALUATORS else hole_cards
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, cards):
+        key = canonical_key(cards, self.hole_cards)
+        strength = self.entries.get(key)
+        if strength is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return strength
+        self.misses += 1
+        strength = self.evaluator(cards)
+        if self.size:
+            self.entries[key] = strength
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return strength
+
+    def resize(self, size):
+        self.size = size
+        while len(self.entries) > size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,20 +1,41 @@
+import asyncio
+from blinds import BlindSchedule
 from player import Player
 from round import Round
-from math import floor
+from observer import ConsoleRenderer
+from poker import Deck
+from table import Table
+from variant import HOLD_EM, VARIANTS
 
 
 class Game:
-    def __init__(self, players, initial_small_blind=10):
+    def __init__(
+        self,
+        players,
+        initial_small_blind=10,
+        headless=False,
+        observers=(),
+        variant=HOLD_EM,
+        blind_schedule=None,
+    ):
         self.players = players
-        self.small_blind = 10
+        self.variant = variant
+        self.table = Table.seat(players)
+        self.headless = headless
+        self.observers = list(observers)
+        self.small_blind = initial_small_blind
+        self.blind_schedule = blind_schedule or BlindSchedule.doubling(
+            initial_small_blind, hands_per_level=len(players)
+        )
         self.rounds_played = 0
         self.dealer = self.players[0]
+        self.deck = Deck()
 
     def get_players_with_money(self):
         return [p for p in self.players if p.money > 0]
 
     def get_small_blind(self):
-        return self.small_blind * 2 ** floor(self.rounds_played / len(self.players))
+        return self.blind_schedule.small_blind(hands=self.rounds_played)
 
     def get_next_dealer(self):
         possible_dealers = [p for p in self.players if p.money > 0 or p == self.dealer]
@@ -26,7 +47,8 @@ class Game:
         return next(p for p in possible_dealers[1:])
 
     def finish_round(self):
-        input()
+        if not self.headless:
+            input()
         self.rounds_played += 1
         players = self.get_players_with_money()
         assert len(players) >= 1
@@ -37,20 +59,48 @@ class Game:
 
     def display_winner(self):
         winner = sorted(self.players, key=lambda p: p.money, reverse=True)[0]
-        print("\n".join(["-" * 80, f"The winner is {winner.name}!", "-" * 80]))
+        for observer in self.observers:
+            observer.game_won(self, winner)
 
-    def play(self):
+    def play(self, max_rounds=None):
         while len(self.get_players_with_money()) > 1:
+            if max_rounds is not None and self.rounds_played >= max_rounds:
+                return
             poker_round = Round(
                 players=self.get_players_with_money(),
                 small_blind=self.get_small_blind(),
                 dealer=self.dealer,
+                observers=self.observers,
+                deck=self.deck,
+                variant=self.variant,
             )
             poker_round.play()
             self.finish_round()
 
+    async def play_async(self, max_rounds=None):
+        while len(self.get_players_with_money()) > 1:
+            if max_rounds is not None and self.rounds_played >= max_rounds:
+                return
+            poker_round = Round(
+                players=self.get_players_with_money(),
+                small_blind=self.get_small_blind(),
+                dealer=self.dealer,
+                observers=self.observers,
+                deck=self.deck,
+                variant=self.variant,
+            )
+            await poker_round.play_async()
+            self.finish_round()
+            # Hands of bots never suspend, so give the other tables a turn
+            await asyncio.sleep(0)
+
 
 if __name__ == "__main__":
     number_of_players = int(input("How many players? ") or 2)
-    game = Game([Player() for _ in range(number_of_players)])
+    variant = input(f"Variant [{', '.join(VARIANTS)}]: ") or "holdem"
+    game = Game(
+        [Player() for _ in range(number_of_players)],
+        observers=[ConsoleRenderer()],
+        variant=VARIANTS[variant],
+    )
     game.play()
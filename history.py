@@ -0,0 +1,186 @@
+import mmap
+import struct
+from collections import namedtuple
+from action import Action
+from observer import Observer
+from player import Player
+from poker import Poker, Deck
+from round import Round
+from strategy import Strategy
+from turn import Blind
+
+ACTIONS = list(Action)
+NO_CARD = 255
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<BBI")
+SEAT = struct.Struct("<IBB")
+ACTION = struct.Struct("<BBi")
+PAYOUT = struct.Struct("<i")
+
+Hand = namedtuple(
+    "Hand",
+    [
+        "names",
+        "stacks",
+        "dealer",
+        "small_blind",
+        "cards",
+        "board",
+        "actions",
+        "payouts",
+    ],
+)
+
+
+def encode_hand(hand):
+    parts = [HEADER.pack(len(hand.names), hand.dealer, hand.small_blind)]
+    for name, stack, cards in zip(hand.names, hand.stacks, hand.cards):
+        name = name.encode()
+        card_ids = Poker.encode(cards) + [NO_CARD] * (2 - len(cards))
+        parts += [bytes([len(name)]), name, SEAT.pack(stack, *card_ids)]
+    parts.append(bytes([len(hand.board)] + Poker.encode(hand.board)))
+    parts.append(struct.pack("<H", len(hand.actions)))
+    parts += [
+        ACTION.pack(seat, ACTIONS.index(action), amount)
+        for seat, action, amount in hand.actions
+    ]
+    parts += [PAYOUT.pack(payout) for payout in hand.payouts]
+    payload = b"".join(parts)
+    return LENGTH.pack(len(payload)) + payload
+
+
+def decode_hand(buffer, offset=0):
+    seats, dealer, small_blind = HEADER.unpack_from(buffer, offset)
+    offset += HEADER.size
+    names, stacks, cards = [], [], []
+    for _ in range(seats):
+        length = buffer[offset]
+        names.append(bytes(buffer[offset + 1 : offset + 1 + length]).decode())
+        offset += 1 + length
+        stack, *card_ids = SEAT.unpack_from(buffer, offset)
+        offset += SEAT.size
+        stacks.append(stack)
+        cards.append(Poker.decode([c for c in card_ids if c != NO_CARD]))
+    length = buffer[offset]
+    board = Poker.decode(buffer[offset + 1 : offset + 1 + length])
+    offset += 1 + length
+    (count,) = struct.unpack_from("<H", buffer, offset)
+    offset += 2
+    actions = []
+    for seat, action, amount in ACTION.iter_unpack(
+        buffer[offset : offset + count * ACTION.size]
+    ):
+        actions.append((seat, ACTIONS[action], amount))
+    offset += count * ACTION.size
+    payouts = [
+        payout
+        for (payout,) in PAYOUT.iter_unpack(
+            buffer[offset : offset + seats * PAYOUT.size]
+        )
+    ]
+    return Hand(names, stacks, dealer, small_blind, cards, board, actions, payouts)
+
+
+class HandHistoryRecorder(Observer):
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        self.hand = None
+
+    def round_started(self, round):
+        # Seats are packed with exactly two hole cards and replayed as Hold'em
+        if round.variant.hole_cards != 2 or round.variant.pot_limit:
+            raise ValueError(f"hand histories cannot record {round.variant.name}")
+        self.seats = {player: seat for seat, player in enumerate(round.players)}
+        self.hand = Hand(
+            names=[player.name for player in round.players],
+            stacks=[player.money for player in round.players],
+            dealer=self.seats[round.dealer],
+            small_blind=round.small_blind,
+            cards=[],
+            board=[],
+            actions=[],
+            payouts=[0] * len(round.players),
+        )
+
+    def turn_started(self, turn):
+        if isinstance(turn, Blind):
+            self.hand.cards.extend(list(player.cards) for player in turn.players)
+        else:
+            self.hand.board.extend(turn.shared_cards)
+
+    def action_taken(self, player, action, amount):
+        self.hand.actions.append((self.seats[player], action, amount))
+
+    def pot_awarded(self, round, payouts):
+        for player, amount in payouts.items():
+            self.hand.payouts[self.seats[player]] += amount
+        self.file.write(encode_hand(self.hand))
+        self.hand = None
+
+    def close(self):
+        self.file.close()
+
+
+def read_hands(path):
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            view = memoryview(buffer)
+            # Released even when the caller stops early, or closing the mmap fails
+            try:
+                offset = 0
+                while offset < len(buffer):
+                    (length,) = LENGTH.unpack_from(buffer, offset)
+                    offset += LENGTH.size
+                    yield decode_hand(view, offset)
+                    offset += length
+            finally:
+                view.release()
+
+
+class ScriptedStrategy(Strategy):
+    def __init__(self, actions):
+        self.actions = actions
+        self.amount = 0
+
+    def choose_action(self, round, player, actions):
+        seat, action, self.amount = self.actions.pop(0)
+        return action
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        return self.amount - (turn_bet - player_bet)
+
+
+def replay(hand, actions=None, observers=()):
+    script = ScriptedStrategy(list(hand.actions[:actions]))
+    players = [
+        Player(name, money=stack, strategy=script)
+        for name, stack in zip(hand.names, hand.stacks)
+    ]
+    for player, name in zip(players, hand.names):
+        player.name = name
+
+    # Burn cards are not recorded, any card that was not dealt will do
+    used = set(hand.board).union(*hand.cards)
+    unused = [card for card in Poker.DECK if card not in used]
+    board = hand.board + unused[3 : 3 + 5 - len(hand.board)]
+    deck = Deck.stacked(
+        [card for cards in hand.cards for card in cards]
+        + [unused[0]]
+        + board[:3]
+        + [unused[1], board[3], unused[2], board[4]]
+    )
+
+    round = Round(
+        players,
+        dealer=players[hand.dealer],
+        small_blind=hand.small_blind,
+        observers=observers,
+        deck=deck,
+    )
+    round.start()
+    while script.actions and not round.is_finished:
+        round.prompt_for_action()
+    return round
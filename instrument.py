@@ -0,0 +1,109 @@
+import cProfile
+import io
+import pstats
+from functools import wraps
+from time import perf_counter_ns
+from poker import Poker
+from round import Round
+from turn import PokerTurn
+
+TARGETS = [
+    (Poker, "showdown"),
+    (Poker, "strengths"),
+    (Round, "split_money"),
+    (Round, "notify"),
+    (PokerTurn, "next_player"),
+    (PokerTurn, "is_completed"),
+    (PokerTurn, "notify"),
+]
+
+
+class Timing:
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        # Bucket i counts calls that took between 2**(i-1) and 2**i nanoseconds
+        self.histogram = [0] * 64
+
+    def add(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.histogram[min(elapsed_ns.bit_length(), 63)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0,
+            "histogram_ns": {
+                2**i: calls for i, calls in enumerate(self.histogram) if calls
+            },
+        }
+
+
+timings = {}
+_originals = {}
+
+
+def _timed(name, function):
+    timing = timings.setdefault(name, Timing())
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timing.add(perf_counter_ns() - start)
+
+    return wrapper
+
+
+def enable(targets=TARGETS):
+    # Methods are only wrapped while enabled, so the disabled cost is zero
+    for cls, attribute in targets:
+        if (cls, attribute) in _originals:
+            continue
+        original = cls.__dict__[attribute]
+        _originals[(cls, attribute)] = original
+        setattr(cls, attribute, _timed(f"{cls.__name__}.{attribute}", original))
+
+
+def disable():
+    for (cls, attribute), original in _originals.items():
+        setattr(cls, attribute, original)
+    _originals.clear()
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def reset():
+    for timing in timings.values():
+        timing.__init__()
+
+
+def report():
+    return {name: timing.as_dict() for name, timing in timings.items() if timing.count}
+
+
+def merge(reports):
+    merged = {}
+    for partial in reports:
+        for name, timing in partial.items():
+            merged.setdefault(name, Timing()).merge(timing)
+    return merged
+
+
+def profile_hand(round, sort="cumulative", limit=20):
+    profiler = cProfile.Profile()
+    profiler.runcall(round.play)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+    return output.getvalue()
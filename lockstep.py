@@ -0,0 +1,207 @@
+from random import Random
+import numpy as np
+from action import Action
+from batch import evaluate_batch
+from player import Player
+from poker import Poker, Deck
+from round import Round
+from strategy import Strategy
+from table import Table
+from turn import TexasHoldEmTurn
+
+ACTIONS = list(Action)
+STREETS = list(TexasHoldEmTurn)
+
+
+class Decisions:
+    def __init__(self, tables, rounds):
+        # Rows are gathered as Python lists, numpy is only touched once per column
+        rows, legal, cards, board = [], [], [], []
+        for round in rounds:
+            turn = round.current_turn
+            player = turn.current_player
+            turn_bet, player_bet = turn.turn_bet, turn.bets[player]
+            actions = player.actions(turn_bet, player_bet, turn.raise_limit(player))
+            rows.append(
+                (
+                    player.seat,
+                    STREETS.index(turn.name),
+                    turn_bet - player_bet,
+                    player.money,
+                    round.pot.total,
+                )
+            )
+            legal.append([action in actions for action in ACTIONS])
+            cards.append(list(player.card_ids))
+            shared = Poker.encode(round.shared_cards)
+            board.append(shared + [-1] * (5 - len(shared)))
+        self.tables = np.array(tables, dtype=np.int64)
+        columns = np.array(rows, dtype=np.int64).reshape(-1, 5).T
+        self.seats, self.streets, self.to_call, self.stacks, self.pots = columns
+        self.legal = np.array(legal, dtype=bool).reshape(-1, len(ACTIONS))
+        self.cards = np.array(cards, dtype=np.int64).reshape(-1, 2)
+        self.board = np.array(board, dtype=np.int64).reshape(-1, 5)
+
+    def __len__(self):
+        return len(self.seats)
+
+
+class BatchStrategy:
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def choose_actions(self, decisions):
+        # Returns an index into ACTIONS and a bet or raise amount per decision
+        raise NotImplementedError
+
+
+class BatchCallingStation(BatchStrategy):
+    def choose_actions(self, decisions):
+        legal = decisions.legal
+        choice = np.argmax(legal, axis=1)
+        for action in reversed([Action.CHECK, Action.CALL, Action.ALL_IN]):
+            index = ACTIONS.index(action)
+            choice = np.where(legal[:, index], index, choice)
+        return choice, np.ones(len(decisions), dtype=np.int64)
+
+
+class BatchRandomStrategy(BatchStrategy):
+    def choose_actions(self, decisions):
+        scores = np.where(decisions.legal, self.rng.random(decisions.legal.shape), -1)
+        limit = np.maximum((decisions.stacks - decisions.to_call) // 4, 1)
+        return np.argmax(scores, axis=1), self.rng.integers(1, limit + 1)
+
+
+class _Seat(Strategy):
+    # Player.do asks its strategy for amounts, so the batch answer is parked here
+    def __init__(self, batch_strategy):
+        super().__init__()
+        self.batch_strategy = batch_strategy
+        self.amount = 1
+
+    @property
+    def name(self):
+        return self.batch_strategy.name
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+
+class LockstepRound(Round):
+    __slots__ = ("pending_showdown",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_showdown = False
+
+    def showdown(self, strengths=None):
+        # The engine scores every table that reached the river in one batch
+        if strengths is None:
+            self.pending_showdown = True
+            return
+        self.pending_showdown = False
+        super().showdown(strengths)
+
+
+class LockstepEngine:
+    def __init__(
+        self, tables, strategies, money=1000, small_blind=10, seed=None, observers=()
+    ):
+        assert len(strategies) >= 2
+        self.strategies = strategies
+        self.money = money
+        self.small_blind = small_blind
+        self.observers = list(observers)
+        self.tables = []
+        for _ in range(tables):
+            players = [
+                Player(str(seat), money, _Seat(strategy))
+                for seat, strategy in enumerate(strategies)
+            ]
+            Table.seat(players)
+            self.tables.append(players)
+        rng = Random(seed)
+        self.decks = [Deck(rng=rng) for _ in range(tables)]
+        self.hands_played = 0
+
+    def play_hand(self):
+        seats = len(self.strategies)
+        dealer = self.hands_played % seats
+        rounds = []
+        for players, deck in zip(self.tables, self.decks):
+            for player in players:
+                player.money = self.money
+            round = LockstepRound(
+                players,
+                dealer=players[dealer],
+                small_blind=self.small_blind,
+                observers=self.observers,
+                deck=deck,
+            )
+            round.start()
+            rounds.append(round)
+
+        active = list(range(len(rounds)))
+        while active:
+            self.step([(table, rounds[table]) for table in active])
+            active = [table for table in active if not rounds[table].is_finished]
+        self.settle([round for round in rounds if round.pending_showdown])
+
+        self.hands_played += 1
+        return np.array(
+            [
+                [player.money - self.money for player in players]
+                for players in self.tables
+            ]
+        )
+
+    def play(self, hands):
+        return sum(self.play_hand() for _ in range(hands))
+
+    def step(self, rounds):
+        waiting = {}
+        for table, round in rounds:
+            round.notify("waiting_for_action", round)
+            seat = round.current_turn.current_player.strategy
+            waiting.setdefault(seat.batch_strategy, []).append((table, round))
+        for strategy, group in waiting.items():
+            tables, group_rounds = zip(*group)
+            choices, amounts = strategy.choose_actions(Decisions(tables, group_rounds))
+            for round, choice, amount in zip(group_rounds, choices, amounts):
+                round.current_turn.current_player.strategy.amount = int(amount)
+                round.take_action(ACTIONS[choice])
+
+    def settle(self, rounds):
+        hands = [
+            (round, player) for round in rounds for player in round.in_game_players()
+        ]
+        if not hands:
+            return
+        strengths, _ = evaluate_batch(
+            [
+                [*player.card_ids, *Poker.encode(round.shared_cards)]
+                for round, player in hands
+            ]
+        )
+        by_round = {}
+        for (round, player), strength in zip(hands, strengths.tolist()):
+            by_round.setdefault(round, {})[player] = strength
+        for round, round_strengths in by_round.items():
+            round.showdown(round_strengths)
+
+
+if __name__ == "__main__":
+    import time
+
+    engine = LockstepEngine(1000, [BatchRandomStrategy(1), BatchCallingStation()] * 3)
+    start = time.perf_counter()
+    chips = engine.play(10)
+    elapsed = time.perf_counter() - start
+    print(f"{10 * len(engine.tables) / elapsed:.0f} hands/s", chips.sum(axis=0))
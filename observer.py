@@ -0,0 +1,99 @@
+from poker import Poker
+
+
+class Observer:
+    def round_started(self, round):
+        pass
+
+    def turn_started(self, turn):
+        pass
+
+    def waiting_for_action(self, round):
+        pass
+
+    def action_taken(self, player, action, amount):
+        pass
+
+    def action_rejected(self, player, action):
+        pass
+
+    def showdown(self, round, players, winners, score):
+        pass
+
+    def pot_awarded(self, round, payouts):
+        pass
+
+    def early_winner(self, round, winner):
+        pass
+
+    def game_won(self, game, winner):
+        pass
+
+
+class ConsoleRenderer(Observer):
+    def turn_started(self, turn):
+        print(turn)
+
+    def waiting_for_action(self, round):
+        print(round)
+        print()
+
+    def action_taken(self, player, action, amount):
+        print(f"{player.name} {action.value}ed")
+
+    def action_rejected(self, player, action):
+        print("Unavailable action, try again")
+
+    def showdown(self, round, players, winners, score):
+        print("\n".join(["=" * 80, "Showdown", "=" * 80]))
+        print(f"Shared cards: {', '.join(round.shared_cards)}")
+        print("\n".join(str(p) for p in players))
+        print(
+            f"The winner {'is' if len(winners) == 1 else 'are'} {' and '.join([p.name for p in winners])} with {Poker.Score(score).name}!"
+        )
+
+    def early_winner(self, round, winner):
+        display = [
+            "=" * 80,
+            "Everybody else folded",
+            "=" * 80,
+            (
+                f"Shared cards: {', '.join(round.shared_cards)}"
+                if round.shared_cards
+                else None
+            ),
+            f"The winner is {winner.name}!",
+        ]
+        print("\n".join([line for line in display if line]))
+
+    def game_won(self, game, winner):
+        print("\n".join(["-" * 80, f"The winner is {winner.name}!", "-" * 80]))
+
+
+class BufferedObserver(Observer):
+    def __init__(self):
+        self.events = []
+
+    def round_started(self, round):
+        self.events.append(("round_started", list(round.players)))
+
+    def turn_started(self, turn):
+        self.events.append(("turn_started", turn.name))
+
+    def action_taken(self, player, action, amount):
+        self.events.append(("action_taken", player, action, amount))
+
+    def action_rejected(self, player, action):
+        self.events.append(("action_rejected", player, action))
+
+    def showdown(self, round, players, winners, score):
+        self.events.append(("showdown", list(winners), score))
+
+    def pot_awarded(self, round, payouts):
+        self.events.append(("pot_awarded", dict(payouts)))
+
+    def early_winner(self, round, winner):
+        self.events.append(("early_winner", winner))
+
+    def game_won(self, game, winner):
+        self.events.append(("game_won", winner))
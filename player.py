@@ -1,21 +1,96 @@
 from random import choice
-from enum import Enum
+from action import Action
+from strategy import HumanStrategy
+from poker import Poker
+from table import Table, MAX_HOLE_CARDS
 
 
-class Action(Enum):
-    FOLD = "fold"
-    CHECK = "check"
-    CALL = "call"
-    BET = "bet"
-    RAISE = "raise"
-    ALL_IN = "all in"
+def _can_call(money, turn_bet, player_bet):
+    return turn_bet > player_bet and money > turn_bet - player_bet
+
+
+def _can_check(money, turn_bet, player_bet):
+    return turn_bet == player_bet
+
+
+def _can_bet(money, turn_bet, player_bet):
+    return money > 0 and _can_check(money, turn_bet, player_bet)
+
+
+def _can_all_in(money, turn_bet, player_bet, limit=None):
+    return (
+        turn_bet >= player_bet
+        and money > 0
+        and (limit is None or money <= turn_bet - player_bet + limit)
+    )
+
+
+def _available_actions(money, turn_bet, player_bet, limit=None):
+    return [
+        Action.FOLD if turn_bet > player_bet else None,
+        Action.CALL if _can_call(money, turn_bet, player_bet) else None,
+        Action.BET if _can_bet(money, turn_bet, player_bet) else None,
+        Action.RAISE if _can_call(money, turn_bet, player_bet) else None,
+        Action.CHECK if _can_check(money, turn_bet, player_bet) else None,
+        Action.ALL_IN if _can_all_in(money, turn_bet, player_bet, limit) else None,
+    ]
+
+
+def legal_actions(money, turn_bet, player_bet, limit=None):
+    # The betting rules for a stack, without a player at a table
+    return [
+        action
+        for action in _available_actions(money, turn_bet, player_bet, limit)
+        if action
+    ]
 
 
 class Player:
-    def __init__(self, name=None, money=1000):
+    __slots__ = ("name", "strategy", "table", "seat")
+
+    def __init__(self, name=None, money=1000, strategy=None):
+        self.table = Table(1)
+        self.seat = 0
         self.money = money
-        self.cards = []
         self.name = f"Player {name or choice('♚♛♜♝♞♟♔♕♖♗♘♙')}"
+        self.strategy = strategy or HumanStrategy()
+
+    def sit(self, table, seat):
+        money, card_ids = self.money, self.card_ids
+        self.table, self.seat = table, seat
+        self.money = money
+        self.card_ids = card_ids
+
+    @property
+    def money(self):
+        return self.table.stacks[self.seat]
+
+    @money.setter
+    def money(self, money):
+        self.table.stacks[self.seat] = money
+
+    @property
+    def card_ids(self):
+        start = self.seat * MAX_HOLE_CARDS
+        return self.table.cards[start : start + self.table.hole_cards[self.seat]]
+
+    @card_ids.setter
+    def card_ids(self, card_ids):
+        assert len(card_ids) <= MAX_HOLE_CARDS
+        start = self.seat * MAX_HOLE_CARDS
+        self.table.cards[start : start + len(card_ids)] = bytes(card_ids)
+        self.table.hole_cards[self.seat] = len(card_ids)
+
+    def has_cards(self):
+        return self.table.hole_cards[self.seat] > 0
+
+    @property
+    def cards(self):
+        return Poker.decode(self.card_ids)
+
+    @cards.setter
+    def cards(self, cards):
+        self.card_ids = Poker.encode(cards)
 
     def bet(self, amount=0):
         bet_amount = min(amount, self.money)
@@ -25,50 +100,31 @@ class Player:
     def __str__(self):
         return f"{self.name}: Cards: {' '.join(self.cards) if self.cards else 'None'}, Money: {str(self.money).rjust(4)}$"
 
-    def _available_actions(self, turn_bet, player_bet):
-        return [
-            Action.FOLD if turn_bet > player_bet else None,
-            Action.CALL if self._can_call(turn_bet, player_bet) else None,
-            Action.BET if self._can_bet(turn_bet, player_bet) else None,
-            Action.RAISE if self._can_call(turn_bet, player_bet) else None,
-            Action.CHECK if self._can_check(turn_bet, player_bet) else None,
-            Action.ALL_IN if self._can_all_in(turn_bet, player_bet) else None,
-        ]
+    def _available_actions(self, turn_bet, player_bet, limit=None):
+        return _available_actions(self.money, turn_bet, player_bet, limit)
 
     def is_all_in(self):
-        return self.money == 0
-
-    def _can_call(self, turn_bet, player_bet):
-        return turn_bet > player_bet and self.money > turn_bet - player_bet
-
-    def _can_check(self, turn_bet, player_bet):
-        return turn_bet == player_bet
-
-    def _can_bet(self, turn_bet, player_bet):
-        return self.money > 0 and self._can_check(turn_bet, player_bet)
-
-    def _can_all_in(self, turn_bet, player_bet):
-        return turn_bet >= player_bet and self.money > 0
+        return self.table.stacks[self.seat] == 0
 
-    def actions(self, turn_bet, player_bet):
-        return [
-            action for action in self._available_actions(turn_bet, player_bet) if action
-        ]
+    def actions(self, turn_bet, player_bet, limit=None):
+        return legal_actions(self.money, turn_bet, player_bet, limit)
 
-    def do(self, action, turn_bet, player_bet):
-        if action in self._available_actions(turn_bet, player_bet):
-            print(f"{self.name} {action.value}ed")
+    def do(self, action, turn_bet, player_bet, limit=None):
+        if action in self._available_actions(turn_bet, player_bet, limit):
             if action == Action.FOLD:
                 self.cards = []
                 return -1
             if action == Action.CALL:
                 return self.bet(turn_bet - player_bet)
             if action == Action.BET:
-                return self.bet(int(input("Bet: ")))
+                amount = self.strategy.bet_amount(self, turn_bet, player_bet)
+                return self.bet(amount if limit is None else min(amount, limit))
             if action == Action.RAISE:
-                return (
-                    self.bet(turn_bet + int(input(f"Raise: {turn_bet} + ")))
+                amount = self.strategy.raise_amount(self, turn_bet, player_bet)
+                return self.bet(
+                    turn_bet
                     - player_bet
+                    + (amount if limit is None else min(amount, limit))
                 )
             if action == Action.CHECK:
                 return 0
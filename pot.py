@@ -0,0 +1,76 @@
+from table import SeatArray
+
+
+class Pot:
+    __slots__ = ("contributions", "total", "folded", "all_in_levels")
+
+    def __init__(self, players):
+        self.contributions = SeatArray(players)
+        self.total = 0
+        self.folded = set()
+        self.all_in_levels = {}
+
+    def add(self, player, amount):
+        amounts, seat = self.contributions.amounts, player.seat
+        amounts[seat] += amount
+        self.total += amount
+        if player.is_all_in():
+            self.all_in_levels[player] = amounts[seat]
+
+    def fold(self, player):
+        self.folded.add(player)
+
+    def get(self, player):
+        return self.contributions[player]
+
+    def _seat_layers(self):
+        contenders = [p for p in self.contributions if p not in self.folded]
+        caps = [self.all_in_levels[p] for p in contenders if p in self.all_in_levels]
+        players = {player.seat: player for player in contenders}
+        return players, seat_layers(self.contributions.amounts, list(players), caps)
+
+    def layers(self):
+        players, layers = self._seat_layers()
+        return [
+            (amount, [players[seat] for seat in eligible])
+            for amount, eligible in layers
+        ]
+
+    def payouts(self, strengths):
+        players, layers = self._seat_layers()
+        payouts = seat_payouts(
+            layers, {player.seat: strength for player, strength in strengths.items()}
+        )
+        return {players[seat]: amount for seat, amount in payouts.items()}
+
+
+def seat_layers(contributions, contenders, caps):
+    # Each all-in caps a side pot; the last layer takes whatever is left.
+    # contributions is indexed by seat and contenders are seats in payout order
+    levels = sorted({*caps, max(contributions[seat] for seat in contenders)})
+    layers = []
+    previous = 0
+    for level in levels:
+        amount = sum(min(c, level) - min(c, previous) for c in contributions)
+        eligible = [seat for seat in contenders if contributions[seat] >= level]
+        layers.append((amount, eligible))
+        previous = level
+    overflow = sum(max(c - previous, 0) for c in contributions)
+    if overflow:
+        amount, eligible = layers[-1]
+        layers[-1] = (amount + overflow, eligible)
+    return layers
+
+
+def seat_payouts(layers, strengths):
+    # Odd chips go to the earliest winners of each layer
+    payouts = {}
+    for amount, eligible in layers:
+        best = max(strengths[seat] for seat in eligible)
+        winners = [seat for seat in eligible if strengths[seat] == best]
+        share, odd_chips = divmod(amount, len(winners))
+        for i, winner in enumerate(winners):
+            payouts[winner] = (
+                payouts.get(winner, 0) + share + (1 if i < odd_chips else 0)
+            )
+    return payouts
@@ -0,0 +1,136 @@
+import argparse
+import mmap
+import os
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from equity import equity
+from poker import Poker
+
+MAGIC = b"PPEQ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+MAX_OPPONENTS = 9
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop.bin")
+
+# The 169 starting hands on a 13x13 grid: pairs on the diagonal, suited hands
+# above it (high rank first) and offsuit hands below it (low rank first)
+HAND_CLASSES = 13 * 13
+
+
+def hand_class(cards):
+    first, second = (Poker.CARD_IDS[card] for card in cards)
+    high, low = max(first >> 2, second >> 2), min(first >> 2, second >> 2)
+    if (first & 3) == (second & 3):
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_name(index):
+    row, column = divmod(index, 13)
+    if row == column:
+        return Poker.RANKS[row] * 2
+    if row > column:
+        return f"{Poker.RANKS[row]}{Poker.RANKS[column]}s"
+    return f"{Poker.RANKS[column]}{Poker.RANKS[row]}o"
+
+
+def class_cards(index):
+    row, column = divmod(index, 13)
+    suited = row > column
+    high, low = max(row, column), min(row, column)
+    return [
+        Poker.RANKS[high] + Poker.SUITS[0],
+        Poker.RANKS[low] + Poker.SUITS[0 if suited else 1],
+    ]
+
+
+class PreflopTable:
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, opponents, classes, iterations = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION or classes != HAND_CLASSES:
+            raise ValueError(
+                f"{path} is not a version {VERSION} preflop table, "
+                "regenerate it with `python preflop.py build`"
+            )
+        self.opponents = opponents
+        self.iterations = iterations
+        self.equities = memoryview(self.buffer)[HEADER.size :].cast("f")
+
+    def equity(self, cards, opponents=1):
+        assert 1 <= opponents <= self.opponents
+        return self.equities[(opponents - 1) * HAND_CLASSES + hand_class(cards)]
+
+
+_table = None
+
+
+def load(path=DEFAULT_PATH):
+    global _table
+    _table = PreflopTable(path)
+    return _table
+
+
+def preflop_equity(cards, opponents=1):
+    return (_table or load()).equity(cards, opponents)
+
+
+def _class_equities(index, opponents, iterations):
+    return [
+        equity(
+            [class_cards(index)],
+            opponents=n,
+            iterations=iterations,
+            seed=index * MAX_OPPONENTS + n,
+        )[0].equity
+        for n in range(1, opponents + 1)
+    ]
+
+
+def build(path=DEFAULT_PATH, opponents=MAX_OPPONENTS, iterations=20000, workers=None):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(
+            executor.map(
+                _class_equities,
+                range(HAND_CLASSES),
+                [opponents] * HAND_CLASSES,
+                [iterations] * HAND_CLASSES,
+            )
+        )
+    values = array(
+        "f", [rows[index][n] for n in range(opponents) for index in range(HAND_CLASSES)]
+    )
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, opponents, HAND_CLASSES, iterations))
+        values.tofile(file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preflop equity table")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="regenerate the table")
+    build_parser.add_argument("--output", default=DEFAULT_PATH)
+    build_parser.add_argument("--opponents", type=int, default=MAX_OPPONENTS)
+    build_parser.add_argument("--iterations", type=int, default=20000)
+    build_parser.add_argument("--workers", type=int, default=None)
+    show_parser = commands.add_parser("show", help="print the table")
+    show_parser.add_argument("--input", default=DEFAULT_PATH)
+    arguments = parser.parse_args()
+
+    if arguments.command == "build":
+        build(
+            arguments.output,
+            opponents=arguments.opponents,
+            iterations=arguments.iterations,
+            workers=arguments.workers,
+        )
+    else:
+        table = load(arguments.input)
+        for index in range(HAND_CLASSES):
+            equities = [
+                f"{table.equities[n * HAND_CLASSES + index]:.3f}"
+                for n in range(table.opponents)
+            ]
+            print(class_name(index).ljust(4), " ".join(equities))
@@ -0,0 +1,213 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import combinations, islice
+from math import comb, prod, sqrt
+from random import Random
+import numpy as np
+from batch import evaluate_batch
+from equity import Equity
+from poker import Poker
+from ranges import parse_range
+
+# combos counts each range's combos left on the board, combos_per_second the
+# matchups of one combo per range scored each second
+RangeEquity = namedtuple(
+    "RangeEquity",
+    ["equities", "combos", "runouts", "matchups", "seconds", "combos_per_second"],
+)
+
+# Upper bound on the elements of the (runouts, combos, combos, ...) arrays
+BLOCK_SIZE = 1 << 20
+# Upper bound on the matchup grid, one cell per combination of one combo per
+# range: two full ranges fit, three wide ones would need gigabytes per worker
+MAX_GRID_SIZE = 1 << 22
+
+# Set once per worker process by the pool initializer, tasks only carry bounds
+_job = {}
+
+
+def _along(array, axis, seats):
+    # Moves the combo axis of a (runouts, combos) array onto its own grid axis
+    shape = [array.shape[0]] + [1] * seats
+    shape[axis + 1] = array.shape[1]
+    return array.reshape(shape)
+
+
+def _matchup_grid(combos, weights):
+    # Weight of every combination of one combo per range, 0 when two share a card
+    seats = len(combos)
+    grid = reduce(
+        np.multiply,
+        (_along(weight[None], seat, seats)[0] for seat, weight in enumerate(weights)),
+    )
+    for first, second in combinations(range(seats), 2):
+        overlap = (
+            combos[first][:, None, :, None] == combos[second][None, :, None, :]
+        ).any(axis=(2, 3))
+        shape = [1] * seats
+        shape[first], shape[second] = overlap.shape
+        grid = grid * ~overlap.reshape(shape)
+    return grid
+
+
+def _init_worker(combos, weights, board, missing, seed):
+    deck = [card for card in range(52) if card not in board]
+    _job.update(
+        combos=combos,
+        grid=_matchup_grid(combos, weights),
+        board=np.array(board, dtype=np.int64),
+        deck=deck,
+        missing=missing,
+        seed=seed,
+    )
+
+
+def _runouts(start, stop):
+    deck, missing, seed = _job["deck"], _job["missing"], _job["seed"]
+    if seed is None:
+        runouts = list(islice(combinations(deck, missing), start, stop))
+    else:
+        rng = Random(seed + start)
+        runouts = [rng.sample(deck, missing) for _ in range(stop - start)]
+    return np.array(runouts, dtype=np.int64).reshape(stop - start, missing)
+
+
+def _runout_chunk(start, stop):
+    combos, grid = _job["combos"], _job["grid"]
+    seats = len(combos)
+    runouts = _runouts(start, stop)
+    count = len(runouts)
+    boards = np.hstack([np.tile(_job["board"], (count, 1)), runouts])
+
+    # Every combo of every range is scored once per runout, in one batch
+    strengths, live = [], []
+    for hands in combos:
+        cards = np.concatenate(
+            [
+                np.broadcast_to(hands, (count, len(hands), 2)),
+                np.broadcast_to(boards[:, None], (count, len(hands), boards.shape[1])),
+            ],
+            axis=2,
+        )
+        strengths.append(evaluate_batch(cards.reshape(-1, 7))[0].reshape(count, -1))
+        live.append(
+            ~(hands[None, :, :, None] == runouts[:, None, None, :]).any(axis=(2, 3))
+        )
+
+    wins, ties = np.zeros(seats), np.zeros(seats)
+    shares = np.zeros((seats, count))
+    weights = np.zeros(count)
+    matchups = 0
+    block = max(1, BLOCK_SIZE // grid.size)
+    for low in range(0, count, block):
+        high = min(low + block, count)
+        scores = [_along(s[low:high], seat, seats) for seat, s in enumerate(strengths)]
+        weight = grid[None] * reduce(
+            np.multiply,
+            (_along(alive[low:high], seat, seats) for seat, alive in enumerate(live)),
+        )
+        best = reduce(np.maximum, scores)
+        winners = sum((score == best).astype(np.int64) for score in scores)
+        axes = tuple(range(1, seats + 1))
+        for seat, score in enumerate(scores):
+            won = (score == best) * weight
+            wins[seat] += won[np.broadcast_to(winners == 1, won.shape)].sum()
+            ties[seat] += won[np.broadcast_to(winners > 1, won.shape)].sum()
+            shares[seat, low:high] = (won / winners).sum(axis=axes)
+        weights[low:high] = weight.sum(axis=axes)
+        matchups += np.count_nonzero(weight)
+
+    return {
+        "wins": wins,
+        "ties": ties,
+        "shares": shares.sum(axis=1),
+        "share_squares": (shares * shares).sum(axis=1),
+        "share_weights": (shares * weights).sum(axis=1),
+        "weights": weights.sum(),
+        "weight_squares": (weights * weights).sum(),
+        "runouts": count,
+        "matchups": matchups,
+    }
+
+
+def range_equity(
+    ranges, board=(), iterations=10000, seed=0, workers=None, chunks_per_worker=4
+):
+    board = Poker.encode(board)
+    assert len(ranges) >= 2 and len(board) <= 5
+    combos, weights = [], []
+    for hand_range in ranges:
+        hand_range = (
+            parse_range(hand_range) if isinstance(hand_range, str) else hand_range
+        )
+        live = [
+            (combo, weight)
+            for combo, weight in hand_range.items()
+            if weight > 0 and not set(combo) & set(board)
+        ]
+        assert live, "a range has no combos left on this board"
+        combos.append(np.array([combo for combo, _ in live], dtype=np.int64))
+        weights.append(np.array([weight for _, weight in live], dtype=float))
+    grid_size = prod(len(hands) for hands in combos)
+    if grid_size > MAX_GRID_SIZE:
+        raise ValueError(
+            f"{grid_size} matchups per runout is too many, narrow the ranges"
+        )
+
+    missing = 5 - len(board)
+    total = comb(52 - len(board), missing)
+    exact = total <= iterations
+    count = total if exact else iterations
+    workers = workers or os.cpu_count()
+    step = -(-count // (workers * chunks_per_worker))
+    bounds = [(start, min(start + step, count)) for start in range(0, count, step)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(combos, weights, board, missing, None if exact else seed),
+    ) as executor:
+        parts = list(executor.map(_runout_chunk, *zip(*bounds)))
+    elapsed = time.perf_counter() - start
+
+    totals = {key: sum(part[key] for part in parts) for key in parts[0]}
+    weight = float(totals["weights"])
+    assert weight, "every combination of the ranges shares a card"
+    runouts = totals["runouts"]
+
+    equities = []
+    for seat in range(len(ranges)):
+        equity = float(totals["shares"][seat] / weight)
+        # Ratio estimator over runouts: var(share - equity * weight) / mean weight
+        residual = (
+            totals["share_squares"][seat]
+            - 2 * equity * totals["share_weights"][seat]
+            + equity * equity * totals["weight_squares"]
+        ) / runouts
+        equities.append(
+            Equity(
+                win=float(totals["wins"][seat] / weight),
+                tie=float(totals["ties"][seat] / weight),
+                lose=float(1 - (totals["wins"][seat] + totals["ties"][seat]) / weight),
+                equity=equity,
+                stderr=(
+                    0.0
+                    if exact
+                    else sqrt(max(residual, 0) / runouts) * runouts / weight
+                ),
+                samples=runouts,
+            )
+        )
+    matchups = int(totals["matchups"])
+    return RangeEquity(
+        equities,
+        [len(hands) for hands in combos],
+        runouts,
+        matchups,
+        elapsed,
+        matchups / elapsed,
+    )
@@ -0,0 +1,155 @@
+import re
+from itertools import combinations, permutations
+from poker import Poker
+
+# Every relabelling of the four suits, as a card id -> card id map
+SUIT_MAPS = [
+    [card & ~3 | suits[card & 3] for card in range(52)]
+    for suits in permutations(range(4))
+]
+
+RANK_SYMBOLS = {**{rank: i for i, rank in enumerate(Poker.RANKS)}, "T": 8}
+SUIT_SYMBOLS = {
+    **{suit: i for i, suit in enumerate(Poker.SUITS)},
+    "s": 0,
+    "c": 1,
+    "h": 2,
+    "d": 3,
+}
+
+_RANK = f"[{''.join(RANK_SYMBOLS)}]"
+_SUIT = f"[{''.join(SUIT_SYMBOLS)}]"
+COMBO = re.compile(f"({_RANK})({_SUIT})({_RANK})({_SUIT})")
+CLASS = re.compile(f"({_RANK})({_RANK})([so]?)(\\+?)")
+SPAN = re.compile(f"({_RANK})({_RANK})([so]?)-({_RANK})({_RANK})([so]?)")
+
+
+def _image(suit_map, cards):
+    return tuple(sorted(suit_map[card] for card in cards))
+
+
+def stabilizer(*card_sets):
+    # The relabellings that map each of the card sets onto itself
+    card_sets = [tuple(sorted(cards)) for cards in card_sets]
+    return [
+        suit_map
+        for suit_map in SUIT_MAPS
+        if all(_image(suit_map, cards) == cards for cards in card_sets)
+    ]
+
+
+def canonical_ids(hole, board=()):
+    return min(
+        (_image(suit_map, hole), _image(suit_map, board)) for suit_map in SUIT_MAPS
+    )
+
+
+def canonicalize(hole, board=()):
+    hole, board = canonical_ids(Poker.encode(hole), Poker.encode(board))
+    return Poker.decode(hole), Poker.decode(board)
+
+
+def canonical_subsets(cards, size, symmetries=SUIT_MAPS):
+    # cards must be closed under the symmetries; yields each orbit once, as its
+    # smallest member, with the number of subsets in the orbit
+    if len(symmetries) == 1:
+        yield from ((subset, 1) for subset in combinations(sorted(cards), size))
+        return
+    for subset in combinations(sorted(cards), size):
+        images = [_image(suit_map, subset) for suit_map in symmetries]
+        if min(images) == subset:
+            yield subset, len(symmetries) // images.count(subset)
+
+
+def canonical_classes(hole_cards=2, board_cards=0):
+    for hole, hole_count in canonical_subsets(range(52), hole_cards):
+        if not board_cards:
+            yield hole, (), hole_count
+            continue
+        rest = [card for card in range(52) if card not in hole]
+        for board, board_count in canonical_subsets(
+            rest, board_cards, stabilizer(hole)
+        ):
+            yield hole, board, hole_count * board_count
+
+
+def _ranks(first, second):
+    return sorted((RANK_SYMBOLS[first], RANK_SYMBOLS[second]), reverse=True)
+
+
+def _class_combos(high, low, suitedness):
+    if high == low:
+        return [(high * 4 + a, high * 4 + b) for a, b in combinations(range(4), 2)]
+    return [
+        (low * 4 + second, high * 4 + first)
+        for first in range(4)
+        for second in range(4)
+        if not suitedness or suitedness == ("s" if first == second else "o")
+    ]
+
+
+def _token_combos(token):
+    match = COMBO.fullmatch(token)
+    if match:
+        first, second = (
+            RANK_SYMBOLS[match[i]] * 4 + SUIT_SYMBOLS[match[i + 1]] for i in (1, 3)
+        )
+        if first == second:
+            raise ValueError(f"{token!r} uses the same card twice")
+        return [tuple(sorted((first, second)))]
+
+    match = CLASS.fullmatch(token)
+    if match:
+        high, low = _ranks(match[1], match[2])
+        suitedness, plus = match[3], match[4]
+        if high == low and suitedness:
+            raise ValueError(f"pairs cannot be suited or offsuit: {token!r}")
+        if not plus:
+            return _class_combos(high, low, suitedness)
+        if high == low:
+            return [
+                combo
+                for rank in range(low, 13)
+                for combo in _class_combos(rank, rank, "")
+            ]
+        return [
+            combo
+            for kicker in range(low, high)
+            for combo in _class_combos(high, kicker, suitedness)
+        ]
+
+    match = SPAN.fullmatch(token)
+    if match:
+        first, last = _ranks(match[1], match[2]), _ranks(match[4], match[5])
+        if match[3] != match[6]:
+            raise ValueError(f"mixed suitedness in {token!r}")
+        if first[0] == first[1] and last[0] == last[1]:
+            lowest, highest = sorted((first[0], last[0]))
+            return [
+                combo
+                for rank in range(lowest, highest + 1)
+                for combo in _class_combos(rank, rank, "")
+            ]
+        if first[0] != last[0] or first[0] in (first[1], last[1]):
+            raise ValueError(f"{token!r} must keep the same high card")
+        lowest, highest = sorted((first[1], last[1]))
+        return [
+            combo
+            for kicker in range(lowest, highest + 1)
+            for combo in _class_combos(first[0], kicker, match[3])
+        ]
+
+    raise ValueError(f"cannot parse range token {token!r}")
+
+
+def parse_range(text):
+    # "AKs, TT+, 76o, A5s-A2s, AhKh, QJs:0.5" -> {(low card id, high card id): weight}
+    combos = {}
+    for token in text.replace(" ", "").split(","):
+        if not token:
+            continue
+        token, _, weight = token.partition(":")
+        weight = float(weight) if weight else 1.0
+        for combo in _token_combos(token):
+            combos[combo] = weight
+    return combos
@@ -1,23 +1,50 @@
 from player import Player, Action
-from poker import Poker
-from turn import Status, Blind, Flop, Turn, River
+from poker import Poker, Deck
+from pot import Pot
+from table import Table
+from turn import Status, Blind
+from variant import HOLD_EM
+from evaluator import unpack
 from enum import Enum
-from functools import reduce
 
 
 class Round:
-    TEXAS_HOLD_EM_TURNS = lambda small_blind: [
-        Blind(small_blind=small_blind),
-        Flop(),
-        Turn(),
-        River(),
-    ]
-
-    def __init__(self, players=[Player(), Player()], dealer=None, small_blind=10):
+    __slots__ = (
+        "is_finished",
+        "players",
+        "table",
+        "dealer",
+        "small_blind_player",
+        "small_blind",
+        "big_blind_player",
+        "big_blind",
+        "deck",
+        "shared_cards",
+        "turns",
+        "start_list",
+        "pot",
+        "observers",
+        "variant",
+        "current_turn",
+        "last_betting_player",
+    )
+
+    def __init__(
+        self,
+        players=[Player(), Player()],
+        dealer=None,
+        small_blind=10,
+        observers=(),
+        deck=None,
+        variant=HOLD_EM,
+    ):
         assert len(players) >= 2
         self.is_finished = False
 
         self.players = players
+        if len({id(player.table) for player in players}) > 1:
+            Table.seat(players)
+        self.table = players[0].table
 
         self.dealer = dealer or players[0]
         assert self.dealer in players
@@ -31,13 +58,22 @@ class Round:
         self.big_blind_player = players[big_blind_player_idx]
         self.big_blind = 2 * small_blind
 
-        self.deck = Poker.DECK
+        self.deck = deck if deck is not None else Deck()
         self.shared_cards = []
-        self.turns = Round.TEXAS_HOLD_EM_TURNS(small_blind)
+        self.variant = variant
+        self.turns = [Blind(small_blind=small_blind, hole_cards=variant.hole_cards)] + [
+            street() for street in variant.streets
+        ]
         self.start_list = (
             self.players[small_blind_player_idx:]
             + self.players[:small_blind_player_idx]
         )
+        self.pot = Pot(self.start_list)
+        self.observers = list(observers)
+        for turn in self.turns:
+            turn.observers = self.observers
+            turn.pot = self.pot
+            turn.pot_limit = variant.pot_limit
 
     def _start_next_turn(self, players, deck, first_player):
         upcoming_rounds = [
@@ -46,78 +82,49 @@ class Round:
         if not upcoming_rounds:
             self.showdown()
             self.is_finished = True
-            return [], []
+            return [], deck
         self.current_turn = upcoming_rounds[0]
         self.last_betting_player = self.big_blind_player  # TODO if he's playing
         return self.current_turn.start(players, deck, first_player)
 
-    def showdown(self):
+    def notify(self, event, *args):
+        for observer in self.observers:
+            getattr(observer, event)(*args)
+
+    def showdown(self, strengths=None):
         players = self.in_game_players()
-        print("\n".join(["=" * 80, "Showdown", "=" * 80]))
-        winners, score, ranks = Poker().showdown(players, self.shared_cards)
+        if strengths is None:
+            strengths = Poker().strengths(
+                players, self.shared_cards, self.variant.evaluate
+            )
+        winners, strength = Poker().allmax(players, key=strengths.get)
 
-        self.split_money()
+        self.split_money(strengths)
 
-        print(f"Shared cards: {', '.join(self.shared_cards)}")
-        print("\n".join(str(p) for p in players))
-        print(
-            f"The winner {'is' if len(winners) == 1 else 'are'} {' and '.join([p.name for p in winners])} with {Poker.Score(score).name}!"
-        )
+        self.notify("showdown", self, players, winners, unpack(strength)[0])
 
-    def split_money(
-        self, players=None, bets_of_players=None, original_bets_of_players=None
-    ):
-        players = players or self.in_game_players()
-        bets_of_players = (
-            bets_of_players
-            if bets_of_players is not None
-            else self.get_total_bets_of_players()
-        )
-        original_bets_of_players = (
-            original_bets_of_players
-            if original_bets_of_players is not None
-            else self.get_total_bets_of_players()
-        )
-        money = sum(bets_of_players.values())
-        if money <= 0:
-            return
-        winners, score, ranks = Poker().showdown(players, self.shared_cards)
-
-        other_players = set(players) - set(winners)
-        bets_of_other_players = {o: bets_of_players[o] for o in other_players}
-        bets_of_winners = {w: bets_of_players[w] for w in winners}
-
-        # each winner gets back his own money
-        for w in winners:
-            w.money += bets_of_winners[w]
-            bets_of_players[w] = 0
-
-        # each winner gets back his own money from the other players
-        for w, w_bet in bets_of_winners.items():
-            prize = 0
-            for o, o_bet in bets_of_other_players.items():
-                prize_from_player = min(o_bet, original_bets_of_players[w])
-                bets_of_other_players[o] -= prize_from_player
-                w.money += prize_from_player
-
-        # repeat among the remaining players until all money has been split
-        self.split_money(
-            players=other_players,
-            bets_of_players=bets_of_other_players,
-            original_bets_of_players=original_bets_of_players,
+    def split_money(self, strengths=None):
+        strengths = strengths or Poker().strengths(
+            self.in_game_players(), self.shared_cards, self.variant.evaluate
         )
+        payouts = self.pot.payouts(strengths)
+        for player, amount in payouts.items():
+            player.money += amount
+        self.notify("pot_awarded", self, payouts)
 
     def _end_this_turn(self):
         self.current_turn.end()
 
     def start(self):
+        self.notify("round_started", self)
+        self.deck.reset()
         shared_cards, self.deck = self._start_next_turn(
-            self.players, Poker.DECK, self.dealer
+            self.players, self.deck, self.dealer
         )
         self.shared_cards += shared_cards
 
     def starting_player(self):
-        return next(player for player in self.start_list if player.cards)
+        return next(player for player in self.start_list if player.has_cards())
 
     def role(self, player):
         return (
@@ -140,15 +147,14 @@ class Round:
         return turn.bets[player]
 
     def get_total_bets_of_players(self):
-        merge = lambda x, y: {k: x.get(k, 0) + y.get(k, 0) for k in set(x) | set(y)}
-        return reduce(merge, [turn.bets for turn in self.turns])
+        return dict(self.pot.contributions)
 
     def get_total_bet_of_player(self, player=None):
         player = player or self.current_turn.current_player
-        return self.get_total_bets_of_players().get(player)
+        return self.pot.get(player)
 
     def get_pot(self):
-        return sum(self.get_total_bets_of_players().values())
+        return self.pot.total
 
     def early_winner(self):
         self.is_finished = True
@@ -156,26 +162,21 @@ class Round:
         assert len(in_game_players) == 1
         winner = in_game_players[0]
         winner.money += self.get_pot()
-        display = [
-            "=" * 80,
-            "Everybody else folded",
-            "=" * 80,
-            f"Shared cards: {', '.join(self.shared_cards)}"
-            if self.shared_cards
-            else None,
-            f"The winner is {winner.name}!",
-        ]
-        print("\n".join([line for line in display if line]))
+        self.notify("pot_awarded", self, {winner: self.get_pot()})
+        self.notify("early_winner", self, winner)
 
     def prompt_for_action(self):
-        input_action = input(
-            f"Actions: [{', '.join(action.value for action in self.actions())}]: "
+        player = self.current_turn.current_player
+        self.take_action(player.strategy.choose_action(self, player, self.actions()))
+
+    async def prompt_for_action_async(self):
+        player = self.current_turn.current_player
+        self.take_action(
+            await player.strategy.choose_action_async(self, player, self.actions())
         )
-        if input_action not in [a.value for a in Action]:
-            print(f"{input_action} is not a valid action, please try again")
-            return self.prompt_for_action()
 
-        self.do(Action(input_action))
+    def take_action(self, action):
+        self.do(action)
         if len(self.in_game_players()) == 1:
             return self.early_winner()
         self.update_turn_status()
@@ -196,7 +197,7 @@ class Round:
         turn.do(action, player=player)
 
     def in_game_players(self):
-        return [player for player in self.players if player.cards]
+        return [player for player in self.players if player.has_cards()]
 
     def actions(self, player=None, turn=None):
         turn = turn or self.current_turn
@@ -204,6 +205,7 @@ class Round:
         return player.actions(
             self.get_turn_bet(turn=turn),
             self.get_turn_bet_of_player(player=player, turn=turn),
+            turn.raise_limit(player),
         )
 
     def _standings(self):
@@ -228,11 +230,16 @@ class Round:
         self.start()
         while not self.is_finished:
 
-            print(self)
-            print()
+            self.notify("waiting_for_action", self)
 
             self.prompt_for_action()
 
+    async def play_async(self):
+        self.start()
+        while not self.is_finished:
+            self.notify("waiting_for_action", self)
+            await self.prompt_for_action_async()
+
     def __str__(self):
         standings = self._standings()
         # last = f"Last betting player: {self.last_betting_player.name}"
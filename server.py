@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from action import Action
+from game import Game
+from observer import Observer
+from player import Player
+from strategy import Strategy
+from turn import TexasHoldEmTurn
+
+ACTION_TIMEOUT = 30.0
+DEFAULT_PORT = 7777
+
+# Line protocol, one space separated message per line.
+# Client -> server: JOIN <table> <name> | ACT <action> [amount] | QUIT
+# Server -> client: SEATED <table> <seat> | HAND <dealer> <seat>:<stack>... |
+#   CARDS <card>... | BOARD <street> <card>... | ACTIONS <action>... |
+#   ACTED <seat> <action> <amount> | REJECTED <action> | TIMEOUT <action> |
+#   SHOWN <seat> <card>... | WON <seat> <amount> | WINNER <seat> | END | ERROR <text>
+
+
+def _action_name(action):
+    return action.name.lower()
+
+
+def _resolve(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = None
+        self.table = None
+        self.closed = False
+        self.outgoing = []
+
+    def send(self, *words):
+        if self.closed:
+            return
+        # Messages are batched into one write per event loop iteration
+        if not self.outgoing:
+            asyncio.get_running_loop().call_soon(self.flush)
+        self.outgoing.append(" ".join(str(word) for word in words))
+
+    def flush(self):
+        if self.outgoing and not self.writer.is_closing():
+            self.writer.write(("\n".join(self.outgoing) + "\n").encode())
+        self.outgoing.clear()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        if self.pending:
+            _resolve(self.pending, None)
+        self.writer.close()
+
+
+class RemoteStrategy(Strategy):
+    def __init__(self, connection, timeout=ACTION_TIMEOUT):
+        super().__init__()
+        self.connection = connection
+        self.timeout = timeout
+        self.amount = 1
+
+    def choose_action(self, round, player, actions):
+        # Used when the seat timed out or disconnected
+        return Action.CHECK if Action.CHECK in actions else Action.FOLD
+
+    async def choose_action_async(self, round, player, actions):
+        connection = self.connection
+        if connection.closed:
+            return self.choose_action(round, player, actions)
+        loop = asyncio.get_running_loop()
+        pending = connection.pending = loop.create_future()
+        timer = loop.call_later(self.timeout, _resolve, pending, None)
+        connection.send("ACTIONS", *(_action_name(action) for action in actions))
+        try:
+            choice = await pending
+        finally:
+            timer.cancel()
+            connection.pending = None
+        if choice is None:
+            action = self.choose_action(round, player, actions)
+            connection.send("TIMEOUT", _action_name(action))
+            return action
+        action, self.amount = choice
+        return action
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        return self.amount
+
+
+class TableBroadcaster(Observer):
+    def __init__(self, connections):
+        self.connections = connections
+
+    def broadcast(self, *words):
+        for connection in self.connections:
+            connection.send(*words)
+
+    def round_started(self, round):
+        stacks = (f"{player.seat}:{player.money}" for player in round.players)
+        self.broadcast("HAND", round.dealer.seat, *stacks)
+
+    def turn_started(self, turn):
+        if turn.name == TexasHoldEmTurn.BLIND:
+            for player in turn.players:
+                self.connections[player.seat].send("CARDS", *player.cards)
+        else:
+            self.broadcast("BOARD", turn.name.value, *turn.shared_cards)
+
+    def action_taken(self, player, action, amount):
+        self.broadcast("ACTED", player.seat, _action_name(action), max(amount, 0))
+
+    def action_rejected(self, player, action):
+        self.connections[player.seat].send("REJECTED", _action_name(action))
+
+    def showdown(self, round, players, winners, score):
+        for player in players:
+            self.broadcast("SHOWN", player.seat, *player.cards)
+
+    def pot_awarded(self, round, payouts):
+        for player, amount in payouts.items():
+            if amount:
+                self.broadcast("WON", player.seat, amount)
+
+    def game_won(self, game, winner):
+        self.broadcast("WINNER", winner.seat)
+
+
+class TableServer:
+    def __init__(self, seats=2, money=1000, timeout=ACTION_TIMEOUT, max_rounds=None):
+        self.seats = seats
+        self.money = money
+        self.timeout = timeout
+        self.max_rounds = max_rounds
+        self.waiting = {}
+        self.games = {}
+
+    async def handle(self, reader, writer):
+        connection = Connection(reader, writer)
+        try:
+            async for line in reader:
+                words = line.decode().split()
+                if not words:
+                    continue
+                command, arguments = words[0].upper(), words[1:]
+                if command == "QUIT":
+                    break
+                if command == "JOIN" and len(arguments) == 2:
+                    self.join(connection, *arguments)
+                elif command == "ACT" and arguments:
+                    self.act(connection, arguments)
+                else:
+                    connection.send("ERROR", "unknown command")
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(connection)
+            connection.close()
+
+    def join(self, connection, table, name):
+        if connection.table is not None:
+            return connection.send("ERROR", "already seated")
+        if table in self.games:
+            return connection.send("ERROR", "table is playing")
+        seated = self.waiting.setdefault(table, [])
+        strategy = RemoteStrategy(connection, self.timeout)
+        seated.append((connection, Player(name, self.money, strategy)))
+        connection.table = table
+        connection.send("SEATED", table, len(seated) - 1)
+        if len(seated) == self.seats:
+            del self.waiting[table]
+            self.games[table] = asyncio.create_task(self.run(table, seated))
+
+    def leave(self, connection):
+        # Frees a seat at a table still waiting; seats behind it move up one
+        seated = self.waiting.get(connection.table, [])
+        seat = next((i for i, (c, _) in enumerate(seated) if c is connection), None)
+        if seat is None:
+            return
+        del seated[seat]
+        if not seated:
+            del self.waiting[connection.table]
+        for moved, (other, _) in enumerate(seated[seat:], seat):
+            other.send("SEATED", connection.table, moved)
+
+    def act(self, connection, arguments):
+        if connection.pending is None or connection.pending.done():
+            return connection.send("ERROR", "not your turn")
+        try:
+            action = Action[arguments[0].upper()]
+            amount = max(int(arguments[1]), 1) if len(arguments) > 1 else 1
+        except (KeyError, ValueError):
+            return connection.send("ERROR", "unknown action")
+        _resolve(connection.pending, (action, amount))
+
+    async def run(self, table, seated):
+        connections = [connection for connection, _ in seated]
+        game = Game(
+            [player for _, player in seated],
+            headless=True,
+            observers=[TableBroadcaster(connections)],
+        )
+        try:
+            await game.play_async(max_rounds=self.max_rounds)
+        finally:
+            del self.games[table]
+            for connection in connections:
+                connection.send("END")
+                connection.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def bot_client(host, port, table, name, rng, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"JOIN {table} {name}\n".encode())
+    seat, sent = None, None
+    async for line in reader:
+        words = line.decode().split()
+        if words[0] == "SEATED":
+            seat = words[2]
+        elif words[0] == "ACTIONS":
+            choice = rng.choice(words[1:])
+            amount = f" {rng.randint(1, 50)}" if choice in ("bet", "raise") else ""
+            sent = time.perf_counter()
+            writer.write(f"ACT {choice}{amount}\n".encode())
+        elif words[0] == "ACTED" and words[1] == seat and sent is not None:
+            latencies.append(time.perf_counter() - sent)
+            sent = None
+        elif words[0] == "END":
+            break
+    writer.close()
+
+
+async def load(host, port, tables, seats, seed=0):
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            bot_client(host, port, f"t{table}", f"{table}.{seat}", rng, latencies)
+            for table in range(tables)
+            for seat in range(seats)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "tables": tables,
+        "actions": len(latencies),
+        "seconds": elapsed,
+        "actions_per_second": len(latencies) / elapsed,
+        "latency_ms": (
+            {
+                f"p{percentile}": 1000 * latencies[len(latencies) * percentile // 100]
+                for percentile in (50, 90, 99)
+            }
+            if latencies
+            else {}
+        ),
+    }
+
+
+async def client(host, port, table, name):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"JOIN {table} {name}\n".encode())
+
+    async def forward_input():
+        loop = asyncio.get_running_loop()
+        while line := await loop.run_in_executor(None, sys.stdin.readline):
+            writer.write(f"ACT {line}".encode())
+
+    typing = asyncio.create_task(forward_input())
+    async for line in reader:
+        print(line.decode(), end="")
+    typing.cancel()
+
+
+async def serve_forever(server, host, port):
+    async with await server.serve(host, port) as listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-table poker server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the table server")
+    serve_parser.add_argument("--seats", type=int, default=2)
+    serve_parser.add_argument("--money", type=int, default=1000)
+    serve_parser.add_argument("--timeout", type=float, default=ACTION_TIMEOUT)
+    serve_parser.add_argument("--max-rounds", type=int, default=None)
+    client_parser = commands.add_parser("client", help="join a table from stdin")
+    client_parser.add_argument("table")
+    client_parser.add_argument("name")
+    load_parser = commands.add_parser("load", help="fill tables with random bots")
+    load_parser.add_argument("--tables", type=int, default=100)
+    load_parser.add_argument("--seats", type=int, default=2)
+    arguments = parser.parse_args()
+
+    if arguments.command == "serve":
+        server = TableServer(
+            seats=arguments.seats,
+            money=arguments.money,
+            timeout=arguments.timeout,
+            max_rounds=arguments.max_rounds,
+        )
+        asyncio.run(serve_forever(server, arguments.host, arguments.port))
+    elif arguments.command == "client":
+        asyncio.run(
+            client(arguments.host, arguments.port, arguments.table, arguments.name)
+        )
+    else:
+        print(
+            asyncio.run(
+                load(arguments.host, arguments.port, arguments.tables, arguments.seats)
+            )
+        )
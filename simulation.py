@@ -0,0 +1,134 @@
+import cProfile
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import instrument
+from game import Game
+from player import Player
+from stats import Stats, StatsObserver
+
+
+def play_game(strategies, seed, money=1000, max_rounds=200, observers=()):
+    random.seed(seed)
+    players = [
+        Player(name=str(seat), money=money, strategy=strategy(seed=seed * 31 + seat))
+        for seat, strategy in enumerate(strategies)
+    ]
+    game = Game(players, headless=True, observers=observers)
+    game.play(max_rounds=max_rounds)
+    results = [(player.strategy.name, player.money - money) for player in players]
+    return results, game.rounds_played
+
+
+def play_games(
+    strategies,
+    seeds,
+    money=1000,
+    max_rounds=200,
+    instrumented=False,
+    profile_dir=None,
+    stats=False,
+):
+    observers = [StatsObserver()] if stats else []
+    if instrumented:
+        # Pool workers run several chunks, so only this chunk's calls are counted
+        instrument.reset()
+        instrument.enable()
+    profiler = cProfile.Profile() if profile_dir else None
+    if profiler:
+        profiler.enable()
+
+    chips = defaultdict(int)
+    seats = defaultdict(int)
+    hands = 0
+    for seed in seeds:
+        results, rounds_played = play_game(
+            strategies, seed, money, max_rounds, observers
+        )
+        for name, won in results:
+            chips[name] += won
+            seats[name] += 1
+        hands += rounds_played
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(profile_dir, f"chunk-{seeds[0]}.prof"))
+    return (
+        dict(chips),
+        dict(seats),
+        hands,
+        instrument.merge([instrument.timings]) if instrumented else {},
+        observers[0].stats if stats else None,
+    )
+
+
+def simulate(
+    strategies,
+    games=1000,
+    workers=None,
+    seed=0,
+    money=1000,
+    max_rounds=200,
+    instrumented=False,
+    profile_dir=None,
+    stats=False,
+):
+    workers = workers or os.cpu_count()
+    seeds = [seed + game for game in range(games)]
+    chunks = [seeds[i::workers] for i in range(workers) if seeds[i::workers]]
+    chips = defaultdict(int)
+    seats = defaultdict(int)
+    hands = 0
+    timings = []
+    merged = Stats()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                play_games,
+                strategies,
+                chunk,
+                money,
+                max_rounds,
+                instrumented,
+                profile_dir,
+                stats,
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            chunk_chips, chunk_seats, chunk_hands, chunk_timings, chunk_stats = (
+                future.result()
+            )
+            for name, won in chunk_chips.items():
+                chips[name] += won
+                seats[name] += chunk_seats[name]
+            hands += chunk_hands
+            timings.append(chunk_timings)
+            if chunk_stats:
+                merged.merge(chunk_stats)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "hands": hands,
+        "seconds": elapsed,
+        "hands_per_second": hands / elapsed,
+        "hands_per_second_per_worker": hands / elapsed / len(chunks),
+        "chips": {name: chips[name] / seats[name] for name in chips},
+        "instrumentation": {
+            name: timing.as_dict()
+            for name, timing in instrument.merge(timings).items()
+            if timing.count
+        },
+        "stats": merged.snapshot() if stats else {},
+    }
+
+
+if __name__ == "__main__":
+    from strategy import CallingStation, RandomStrategy
+
+    print(simulate([RandomStrategy, CallingStation, RandomStrategy], games=100))
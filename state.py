@@ -0,0 +1,304 @@
+import struct
+from collections import namedtuple
+from action import Action
+from player import legal_actions
+from poker import Poker
+from pot import seat_layers, seat_payouts
+from turn import Flop, River, Turn
+from variant import VARIANTS
+
+VARIANT_KEYS = list(VARIANTS)
+# Board cards dealt when each street starts, every one after a burn
+BOARD_CARDS = {Flop: 3, Turn: 1, River: 1}
+HEADER = struct.Struct("<BBBBBI?")
+
+
+def _shuffle(cards, random):
+    # The rest of Deck.draw_id's Fisher-Yates, so forks don't share one runout
+    cards = list(cards)
+    for position in range(len(cards) - 1):
+        swap = position + int(random() * (len(cards) - position))
+        cards[position], cards[swap] = cards[swap], cards[position]
+    return tuple(cards)
+
+
+def _pack_cards(cards):
+    return bytes([len(cards), *cards])
+
+
+def _unpack_cards(buffer, offset):
+    length = buffer[offset]
+    return tuple(buffer[offset + 1 : offset + 1 + length]), offset + 1 + length
+
+
+class State(
+    namedtuple(
+        "State",
+        [
+            "variant",
+            "streets",
+            "street",
+            "order",
+            "stacks",
+            "contributions",
+            "bets",
+            "cards",
+            "board",
+            "deck",
+            "current",
+            "calling",
+            "finished",
+            "payouts",
+        ],
+    )
+):
+    # An immutable snapshot of a Round in progress, seats indexing round.players.
+    # streets holds the board cards dealt by each street after the blinds, order
+    # is the seats from the small blind on, calling is a bit per seat, and the
+    # deck is dealt from its front.
+    __slots__ = ()
+
+    @classmethod
+    def from_round(cls, round, rng=None):
+        # The undrawn cards of a shuffled deck are still sorted, so they are
+        # shuffled with the caller's rng and the live deck's stream is left alone
+        street_classes = [type(turn) for turn in round.turns[1:]]
+        if any(street not in BOARD_CARDS for street in street_classes):
+            raise ValueError("only board variants can be snapshotted")
+        turn = round.current_turn
+        players = round.players
+        seats = {player: seat for seat, player in enumerate(players)}
+        deck = round.deck
+        unseen = tuple(deck.cards[deck.position : deck.size])
+        if deck.shuffled:
+            if rng is None:
+                raise ValueError("snapshotting a shuffled deck needs an rng")
+            unseen = _shuffle(unseen, rng.random)
+        return cls(
+            variant=list(VARIANTS.values()).index(round.variant),
+            streets=tuple(BOARD_CARDS[street] for street in street_classes),
+            street=round.turns.index(turn),
+            order=tuple(seats[player] for player in round.start_list),
+            stacks=tuple(player.money for player in players),
+            contributions=tuple(round.pot.contributions[p] for p in players),
+            bets=tuple(turn.bets[player] for player in players),
+            cards=tuple(tuple(player.card_ids) for player in players),
+            board=tuple(Poker.encode(round.shared_cards)),
+            deck=unseen,
+            current=seats[turn.current_player],
+            calling=sum(1 << seats[player] for player in turn.calling_players),
+            finished=round.is_finished,
+            payouts=(0,) * len(players),
+        )
+
+    def fork(self, rng=None):
+        # Given an rng the fork deals a fresh runout of the unseen cards
+        if rng is None:
+            return self._replace()
+        return self._replace(deck=_shuffle(self.deck, rng.random))
+
+    @property
+    def pot(self):
+        return sum(self.contributions)
+
+    def in_game(self):
+        return [seat for seat, cards in enumerate(self.cards) if cards]
+
+    def raise_limit(self, seat):
+        if not VARIANTS[self.variant_key].pot_limit:
+            return None
+        return self.pot + max(self.bets) - self.bets[seat]
+
+    @property
+    def variant_key(self):
+        return VARIANT_KEYS[self.variant]
+
+    def actions(self):
+        if self.finished:
+            return []
+        seat = self.current
+        return legal_actions(
+            self.stacks[seat], max(self.bets), self.bets[seat], self.raise_limit(seat)
+        )
+
+    def apply(self, action, amount=1):
+        # Round.take_action for the current player, BET and RAISE take amount
+        seat = self.current
+        turn_bet, player_bet = max(self.bets), self.bets[seat]
+        limit = self.raise_limit(seat)
+        if self.finished or action not in legal_actions(
+            self.stacks[seat], turn_bet, player_bet, limit
+        ):
+            raise ValueError(f"{action} is not available")
+        stacks, contributions = list(self.stacks), list(self.contributions)
+        bets, cards = list(self.bets), list(self.cards)
+        calling = self.calling
+
+        if action == Action.FOLD:
+            cards[seat] = ()
+            calling &= ~(1 << seat)
+        else:
+            if action == Action.CALL:
+                chips = turn_bet - player_bet
+            elif action == Action.BET:
+                chips = amount if limit is None else min(amount, limit)
+            elif action == Action.RAISE:
+                chips = (
+                    turn_bet
+                    - player_bet
+                    + (amount if limit is None else min(amount, limit))
+                )
+            elif action == Action.ALL_IN:
+                chips = stacks[seat]
+            else:
+                chips = 0
+            chips = min(chips, stacks[seat])
+            stacks[seat] -= chips
+            bets[seat] += chips
+            contributions[seat] += chips
+            if action in (Action.CHECK, Action.CALL) or not stacks[seat]:
+                calling |= 1 << seat
+            if bets[seat] > turn_bet:
+                calling = 1 << seat
+                for other, other_cards in enumerate(cards):
+                    if other_cards and not stacks[other]:
+                        calling |= 1 << other
+
+        state = self._replace(
+            stacks=tuple(stacks),
+            contributions=tuple(contributions),
+            bets=tuple(bets),
+            cards=tuple(cards),
+            current=self._next_seat(seat, cards, stacks),
+            calling=calling,
+        )
+        in_game = state.in_game()
+        if len(in_game) == 1:
+            return state._award({in_game[0]: state.pot})
+        return state._update()
+
+    def _next_seat(self, seat, cards, stacks):
+        count = len(cards)
+        for step in range(1, count + 1):
+            following = (seat + step) % count
+            if cards[following] and stacks[following]:
+                return following
+        return seat
+
+    def _is_completed(self):
+        in_game = self.in_game()
+        calling = bin(self.calling).count("1")
+        all_in = sum(not self.stacks[seat] for seat in in_game)
+        even = len({self.bets[seat] for seat in in_game}) == 1
+        return calling == len(in_game) or (even and len(in_game) - all_in < 2)
+
+    def _update(self):
+        # Round.update_turn_status: start streets until one needs an action
+        state = self
+        while state._is_completed():
+            if state.street == len(state.streets):
+                return state._showdown()
+            dealt = state.streets[state.street]
+            deck = state.deck
+            in_game = state.in_game()
+            calling = 0
+            for seat in in_game:
+                if not state.stacks[seat]:
+                    calling |= 1 << seat
+            state = state._replace(
+                street=state.street + 1,
+                board=state.board + deck[1 : 1 + dealt],
+                deck=deck[1 + dealt :],
+                bets=(0,) * len(state.bets),
+                current=next(seat for seat in state.order if state.cards[seat]),
+                calling=calling,
+            )
+        return state
+
+    def _showdown(self):
+        evaluate = VARIANTS[self.variant_key].evaluate
+        strengths = {
+            seat: evaluate([*self.cards[seat], *self.board]) for seat in self.in_game()
+        }
+        return self._award(self.split(strengths))
+
+    def split(self, strengths):
+        contenders = [seat for seat in self.order if seat in strengths]
+        caps = [
+            self.contributions[seat] for seat in contenders if not self.stacks[seat]
+        ]
+        return seat_payouts(
+            seat_layers(self.contributions, contenders, caps), strengths
+        )
+
+    def _award(self, payouts):
+        won = tuple(payouts.get(seat, 0) for seat in range(len(self.stacks)))
+        return self._replace(
+            stacks=tuple(stack + amount for stack, amount in zip(self.stacks, won)),
+            finished=True,
+            payouts=won,
+        )
+
+    def to_bytes(self):
+        seats = len(self.stacks)
+        numbers = struct.pack(
+            f"<{4 * seats}q",
+            *self.stacks,
+            *self.contributions,
+            *self.bets,
+            *self.payouts,
+        )
+        return b"".join(
+            [
+                HEADER.pack(
+                    self.variant,
+                    seats,
+                    self.street,
+                    self.current,
+                    len(self.streets),
+                    self.calling,
+                    self.finished,
+                ),
+                bytes(self.streets),
+                bytes(self.order),
+                numbers,
+                *(_pack_cards(cards) for cards in self.cards),
+                _pack_cards(self.board),
+                _pack_cards(self.deck),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        variant, seats, street, current, streets, calling, finished = (
+            HEADER.unpack_from(buffer)
+        )
+        offset = HEADER.size
+        street_cards = tuple(buffer[offset : offset + streets])
+        offset += streets
+        order = tuple(buffer[offset : offset + seats])
+        offset += seats
+        numbers = struct.unpack_from(f"<{4 * seats}q", buffer, offset)
+        offset += 32 * seats
+        cards = []
+        for _ in range(seats):
+            hole, offset = _unpack_cards(buffer, offset)
+            cards.append(hole)
+        board, offset = _unpack_cards(buffer, offset)
+        deck, offset = _unpack_cards(buffer, offset)
+        return cls(
+            variant=variant,
+            streets=street_cards,
+            street=street,
+            order=order,
+            stacks=numbers[:seats],
+            contributions=numbers[seats : 2 * seats],
+            bets=numbers[2 * seats : 3 * seats],
+            cards=tuple(cards),
+            board=board,
+            deck=deck,
+            current=current,
+            calling=calling,
+            finished=finished,
+            payouts=numbers[3 * seats :],
+        )
@@ -0,0 +1,209 @@
+import time
+from array import array
+from action import Action
+from observer import Observer
+from turn import TexasHoldEmTurn
+
+FIELDS = [
+    "hands",
+    "vpip",
+    "pfr",
+    "aggressive",
+    "calls",
+    "folds",
+    "showdowns",
+    "showdown_wins",
+    "hands_won",
+    "chips",
+]
+(
+    HANDS,
+    VPIP,
+    PFR,
+    AGGRESSIVE,
+    CALLS,
+    FOLDS,
+    SHOWDOWNS,
+    SHOWDOWN_WINS,
+    HANDS_WON,
+    CHIPS,
+) = range(len(FIELDS))
+VOLUNTARY = {Action.CALL, Action.BET, Action.RAISE, Action.ALL_IN}
+
+
+def _counters(size=1):
+    return array("q", bytes(8 * len(FIELDS) * size))
+
+
+def rates(counters):
+    counters = dict(zip(FIELDS, counters))
+    hands, showdowns = counters["hands"], counters["showdowns"]
+    return {
+        **counters,
+        "vpip_rate": counters["vpip"] / hands if hands else 0.0,
+        "pfr_rate": counters["pfr"] / hands if hands else 0.0,
+        # Postflop bets and raises per call
+        "aggression": (
+            counters["aggressive"] / counters["calls"]
+            if counters["calls"]
+            else float(counters["aggressive"])
+        ),
+        "showdown_rate": showdowns / hands if hands else 0.0,
+        "showdown_win_rate": (
+            counters["showdown_wins"] / showdowns if showdowns else 0.0
+        ),
+        "chips_per_hand": counters["chips"] / hands if hands else 0.0,
+    }
+
+
+class PlayerStats:
+    __slots__ = ("lifetime", "window", "epochs")
+
+    # The window is a ring of time slots, each stamped with the slot's epoch
+    def __init__(self, slots):
+        self.lifetime = _counters()
+        self.window = _counters(slots)
+        self.epochs = array("q", [-1] * slots)
+
+    def add(self, counters, epoch):
+        slots = len(self.epochs)
+        start = epoch % slots * len(FIELDS)
+        if self.epochs[epoch % slots] != epoch:
+            if self.epochs[epoch % slots] > epoch:
+                # Older than anything the ring still holds
+                for field, value in enumerate(counters):
+                    self.lifetime[field] += value
+                return
+            self.epochs[epoch % slots] = epoch
+            self.window[start : start + len(FIELDS)] = _counters()
+        for field, value in enumerate(counters):
+            self.lifetime[field] += value
+            self.window[start + field] += value
+
+    def merge(self, other):
+        size = len(FIELDS)
+        for field, value in enumerate(other.lifetime):
+            self.lifetime[field] += value
+        for slot, epoch in enumerate(other.epochs):
+            start = slot * size
+            if epoch > self.epochs[slot]:
+                self.epochs[slot] = epoch
+                self.window[start : start + size] = other.window[start : start + size]
+            elif epoch == self.epochs[slot] and epoch >= 0:
+                for field in range(size):
+                    self.window[start + field] += other.window[start + field]
+
+    def window_counters(self, epoch):
+        size = len(FIELDS)
+        totals = _counters()
+        for slot, stamp in enumerate(self.epochs):
+            if epoch - len(self.epochs) < stamp <= epoch:
+                for field in range(size):
+                    totals[field] += self.window[slot * size + field]
+        return totals
+
+
+class Stats:
+    # Lifetime and rolling-window counters per player name, a fixed number of
+    # slots each, so partial aggregates from other processes can be merged
+    def __init__(self, window=3600.0, slots=60):
+        self.slot_seconds = window / slots
+        self.slots = slots
+        self.players = {}
+
+    def epoch(self, now):
+        return int(now // self.slot_seconds)
+
+    def record(self, name, counters, now):
+        player = self.players.get(name)
+        if player is None:
+            player = self.players[name] = PlayerStats(self.slots)
+        player.add(counters, self.epoch(now))
+
+    def merge(self, other):
+        assert (other.slot_seconds, other.slots) == (self.slot_seconds, self.slots)
+        for name, player in other.players.items():
+            if name not in self.players:
+                self.players[name] = PlayerStats(self.slots)
+            self.players[name].merge(player)
+        return self
+
+    def snapshot(self, now=None):
+        epoch = self.epoch(time.time() if now is None else now)
+        return {
+            name: {
+                "lifetime": rates(player.lifetime),
+                "window": rates(player.window_counters(epoch)),
+            }
+            for name, player in self.players.items()
+        }
+
+
+class StatsObserver(Observer):
+    # Counts a hand's actions per player and records them when it ends;
+    # exports happen between hands, so tables never wait on a lock
+    def __init__(self, stats=None, export=None, export_every=60.0, clock=time.time):
+        self.stats = stats or Stats()
+        self.export = export
+        self.export_every = export_every
+        self.clock = clock
+        self.next_export = clock() + export_every
+        self.hand = {}
+        self.turn = None
+
+    def round_started(self, round):
+        self.hand = {player: _counters() for player in round.players}
+        for counters in self.hand.values():
+            counters[HANDS] = 1
+        if self.export and self.clock() >= self.next_export:
+            now = self.clock()
+            self.next_export = now + self.export_every
+            self.export(self.stats.snapshot(now))
+
+    def turn_started(self, turn):
+        self.turn = turn
+
+    def action_taken(self, player, action, amount):
+        counters = self.hand.get(player)
+        if counters is None:
+            return
+        turn = self.turn
+        raising = action in (Action.BET, Action.RAISE) or (
+            action == Action.ALL_IN and turn.bets[player] + amount > turn.turn_bet
+        )
+        if action == Action.FOLD:
+            counters[FOLDS] += 1
+        if turn.name == TexasHoldEmTurn.BLIND:
+            if action in VOLUNTARY:
+                counters[VPIP] = 1
+            if raising:
+                counters[PFR] = 1
+        elif raising:
+            counters[AGGRESSIVE] += 1
+        elif action in VOLUNTARY:
+            counters[CALLS] += 1
+
+    def pot_awarded(self, round, payouts):
+        for player, counters in self.hand.items():
+            won = payouts.get(player, 0)
+            counters[HANDS_WON] = won > 0
+            counters[CHIPS] = won - round.pot.get(player)
+
+    def showdown(self, round, players, winners, score):
+        for player in players:
+            if player in self.hand:
+                self.hand[player][SHOWDOWNS] = 1
+        for player in winners:
+            if player in self.hand:
+                self.hand[player][SHOWDOWN_WINS] = 1
+        self.finish_hand()
+
+    def early_winner(self, round, winner):
+        self.finish_hand()
+
+    def finish_hand(self):
+        # Both endings of a Round notify after the pot has been awarded
+        now = self.clock()
+        for player, counters in self.hand.items():
+            self.stats.record(player.name, counters, now)
+        self.hand = {}
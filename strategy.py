@@ -0,0 +1,71 @@
+from random import Random
+from action import Action
+
+
+class Strategy:
+    def __init__(self, seed=None):
+        self.rng = Random(seed)
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def choose_action(self, round, player, actions):
+        raise NotImplementedError
+
+    async def choose_action_async(self, round, player, actions):
+        return self.choose_action(round, player, actions)
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        raise NotImplementedError
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        raise NotImplementedError
+
+    def discard(self, player):
+        # Indexes of the hole cards to swap in a draw, standing pat by default
+        return []
+
+
+class HumanStrategy(Strategy):
+    def choose_action(self, round, player, actions):
+        input_action = input(
+            f"Actions: [{', '.join(action.value for action in actions)}]: "
+        )
+        if input_action not in [a.value for a in Action]:
+            print(f"{input_action} is not a valid action, please try again")
+            return self.choose_action(round, player, actions)
+        return Action(input_action)
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        return int(input("Bet: "))
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        return int(input(f"Raise: {turn_bet} + "))
+
+    def discard(self, player):
+        cards = " ".join(f"{i + 1}:{card}" for i, card in enumerate(player.cards))
+        choice = input(f"Discard [{cards}]: ")
+        return [int(i) - 1 for i in choice.split() if i.isdigit()]
+
+
+class CallingStation(Strategy):
+    def choose_action(self, round, player, actions):
+        for action in [Action.CHECK, Action.CALL, Action.ALL_IN]:
+            if action in actions:
+                return action
+        return actions[0]
+
+
+class RandomStrategy(Strategy):
+    def choose_action(self, round, player, actions):
+        return self.rng.choice(actions)
+
+    def bet_amount(self, player, turn_bet, player_bet):
+        return self.rng.randint(1, max(player.money // 4, 1))
+
+    def raise_amount(self, player, turn_bet, player_bet):
+        return self.rng.randint(1, max((player.money - turn_bet + player_bet) // 4, 1))
+
+    def discard(self, player):
+        return self.rng.sample(range(len(player.card_ids)), self.rng.randint(0, 3))
@@ -0,0 +1,58 @@
+from array import array
+
+MAX_HOLE_CARDS = 5
+
+
+class Table:
+    __slots__ = ("stacks", "cards", "hole_cards")
+
+    # Folded and all-in flags are derived: no hole cards, or an empty stack
+    def __init__(self, size):
+        self.stacks = array("q", bytes(8 * size))
+        self.cards = bytearray(size * MAX_HOLE_CARDS)
+        self.hole_cards = bytearray(size)
+
+    def __len__(self):
+        return len(self.stacks)
+
+    @classmethod
+    def seat(cls, players):
+        table = cls(len(players))
+        for seat, player in enumerate(players):
+            player.sit(table, seat)
+        return table
+
+
+class SeatArray:
+    __slots__ = ("players", "amounts")
+
+    def __init__(self, players):
+        table = players[0].table if players else None
+        assert all(player.table is table for player in players), "different tables"
+        assert len({player.seat for player in players}) == len(players), "shared seat"
+        self.players = players
+        self.amounts = array("q", bytes(8 * len(players[0].table))) if players else []
+
+    def __getitem__(self, player):
+        return self.amounts[player.seat]
+
+    def __setitem__(self, player, amount):
+        self.amounts[player.seat] = amount
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def __len__(self):
+        return len(self.players)
+
+    def keys(self):
+        return list(self.players)
+
+    def values(self):
+        return [self.amounts[player.seat] for player in self.players]
+
+    def items(self):
+        return [(player, self.amounts[player.seat]) for player in self.players]
+
+    def get(self, player, default=None):
+        return self.amounts[player.seat] if player in self.players else default
@@ -0,0 +1,24 @@
+import random
+from itertools import chain, combinations
+import numpy as np
+from batch import evaluate_batch
+from evaluator import SCORE_SHIFT, evaluate5, evaluate7
+
+
+def test_every_five_card_hand():
+    hands = list(combinations(range(52), 5))
+    assert len(hands) == 2598960
+    cards = np.fromiter(chain.from_iterable(hands), dtype=np.int64).reshape(-1, 5)
+    strengths, scores = evaluate_batch(cards)
+    expected = np.fromiter(map(evaluate5, hands), dtype=np.int64, count=len(hands))
+    assert np.array_equal(strengths, expected)
+    assert np.array_equal(scores, expected >> SCORE_SHIFT)
+
+
+def test_seven_card_hands():
+    rng = random.Random(3)
+    hands = [rng.sample(range(52), 7) for _ in range(200000)]
+    strengths, scores = evaluate_batch(np.array(hands, dtype=np.int64))
+    expected = np.array([evaluate7(hand) for hand in hands], dtype=np.int64)
+    assert np.array_equal(strengths, expected)
+    assert np.array_equal(scores, expected >> SCORE_SHIFT)
@@ -0,0 +1,99 @@
+import random
+from itertools import combinations, combinations_with_replacement, product
+from evaluator import StrengthCache, evaluate, evaluate5, evaluate7, evaluate_omaha
+
+
+def brute_force(cards):
+    return max(evaluate5(hand) for hand in combinations(cards, 5))
+
+
+def rank_patterns():
+    # Every multiset of seven ranks a deck can hold
+    for ranks in combinations_with_replacement(range(13), 7):
+        if all(ranks.count(rank) <= 4 for rank in set(ranks)):
+            yield ranks
+
+
+def test_every_rank_pattern():
+    # First copies share a suit, so every flush and straight flush shows up;
+    # rotating the suits by rank covers the same ranks without them
+    for ranks in rank_patterns():
+        for offset in (0, 1):
+            copies = {}
+            cards = []
+            for rank in ranks:
+                copy = copies[rank] = copies.get(rank, -1) + 1
+                cards.append(rank * 4 + (copy + offset * rank) % 4)
+            assert evaluate7(cards) == brute_force(cards), cards
+
+
+def test_every_single_suit_hand():
+    for ranks in combinations(range(13), 7):
+        cards = [rank * 4 + 3 for rank in ranks]
+        assert evaluate7(cards) == brute_force(cards), cards
+
+
+def test_random_hands():
+    rng = random.Random(7)
+    for _ in range(100000):
+        cards = rng.sample(range(52), 7)
+        assert evaluate7(cards) == brute_force(cards), cards
+
+
+def test_evaluate_dispatches_on_length():
+    rng = random.Random(5)
+    for _ in range(1000):
+        cards = rng.sample(range(52), 7)
+        assert evaluate(cards) == evaluate7(cards)
+        assert evaluate(cards[:5]) == evaluate5(cards[:5])
+
+
+def omaha_brute_force(cards):
+    # Two of the four hole cards with three of the five board cards
+    hole, board = cards[:4], cards[4:]
+    return max(
+        evaluate5(two + three)
+        for two, three in product(combinations(hole, 2), combinations(board, 3))
+    )
+
+
+def test_omaha_random_hands():
+    rng = random.Random(8)
+    for _ in range(30000):
+        cards = rng.sample(range(52), 9)
+        assert evaluate_omaha(cards) == omaha_brute_force(cards), cards
+
+
+def test_omaha_flush_heavy_hands():
+    # Two suits only, so most hands hold a flush in the hole, on the board or both
+    rng = random.Random(6)
+    two_suits = [card for card in range(52) if card & 3 < 2]
+    for _ in range(30000):
+        cards = rng.sample(two_suits, 9)
+        assert evaluate_omaha(cards) == omaha_brute_force(cards), cards
+
+
+def relabel(cards, suits):
+    return [card & ~3 | suits[card & 3] for card in cards]
+
+
+def test_cache_matches_its_evaluator_under_suit_relabelling():
+    rng = random.Random(9)
+    cache = StrengthCache(size=1 << 10)
+    for _ in range(20000):
+        cards = rng.sample(range(52), rng.choice((5, 7)))
+        suits = rng.sample(range(4), 4)
+        assert cache.evaluate(cards) == evaluate(cards)
+        assert cache.evaluate(relabel(cards, suits)) == evaluate(cards)
+    assert cache.hits and cache.misses
+    assert len(cache.entries) == 1 << 10
+
+
+def test_omaha_cache_keeps_hole_and_board_apart():
+    rng = random.Random(10)
+    cache = StrengthCache(evaluate=evaluate_omaha, hole_cards=4)
+    for _ in range(5000):
+        cards = rng.sample(range(52), 9)
+        swapped = cards[4:8] + cards[:4] + cards[8:]
+        assert cache.evaluate(cards) == evaluate_omaha(cards)
+        assert cache.evaluate(swapped) == evaluate_omaha(swapped)
@@ -0,0 +1,70 @@
+import random
+from game import Game
+from history import HandHistoryRecorder, decode_hand, encode_hand, read_hands, replay
+from observer import Observer
+from player import Player
+from poker import Deck
+from strategy import CallingStation, RandomStrategy
+
+
+class Results(Observer):
+    # Stacks and payouts of every hand, by seat, once the pot is awarded
+    def __init__(self):
+        self.hands = []
+
+    def pot_awarded(self, round, payouts):
+        self.hands.append(
+            (
+                [player.money for player in round.players],
+                [payouts.get(player, 0) for player in round.players],
+            )
+        )
+
+
+def record(path, games=30):
+    live = Results()
+    recorder = HandHistoryRecorder(path)
+    for seed in range(games):
+        rng = random.Random(seed)
+        players = [
+            Player(
+                str(i),
+                rng.choice((100, 500, 1000)),
+                rng.choice((RandomStrategy, CallingStation))(seed * 10 + i),
+            )
+            for i in range(2 + seed % 9)
+        ]
+        game = Game(players, headless=True, observers=[recorder, live])
+        game.deck = Deck(rng=rng)
+        game.play(max_rounds=40)
+    recorder.close()
+    return live.hands
+
+
+def test_encode_decode_round_trip(tmp_path):
+    path = tmp_path / "hands.bin"
+    record(path, games=5)
+    for hand in read_hands(path):
+        assert decode_hand(encode_hand(hand)[4:]) == hand
+
+
+def test_replay_reaches_the_recorded_results(tmp_path):
+    path = tmp_path / "hands.bin"
+    live = record(path)
+    hands = list(read_hands(path))
+    assert len(hands) == len(live)
+    for hand, (stacks, payouts) in zip(hands, live):
+        assert hand.payouts == payouts
+        replayed = Results()
+        round = replay(hand, observers=[replayed])
+        assert round.is_finished
+        assert replayed.hands == [(stacks, payouts)]
+
+
+def test_reading_can_stop_early(tmp_path):
+    # Closing the mmap fails while a view of it is still exported
+    path = tmp_path / "hands.bin"
+    record(path, games=2)
+    hands = read_hands(path)
+    next(hands)
+    hands.close()
@@ -0,0 +1,126 @@
+import random
+from player import Player
+from pot import Pot
+from table import Table
+
+
+def old_split_money(contributions, contenders, strengths):
+    # Round.split_money before Pot, over plain dicts: winners take back their own
+    # bets, then up to their bet from everyone else, and the rest is split again
+    payouts = {}
+    original = dict(contributions)
+
+    def split(players, bets):
+        if sum(bets.values()) <= 0:
+            return
+        best = max(strengths[player] for player in players)
+        winners = [player for player in players if strengths[player] == best]
+        other_bets = {
+            player: bets[player] for player in players if player not in winners
+        }
+        for winner in winners:
+            payouts[winner] = payouts.get(winner, 0) + bets[winner]
+            bets[winner] = 0
+        for winner in winners:
+            for other, other_bet in other_bets.items():
+                prize = min(other_bet, original[winner])
+                other_bets[other] -= prize
+                payouts[winner] += prize
+        split(list(other_bets), other_bets)
+
+    split(contenders, dict(contributions))
+    return {player: amount for player, amount in payouts.items() if amount}
+
+
+def all_in_scenario(rng, folds=True, ties=True):
+    # Contenders put in up to one level, all in if their stack is shorter;
+    # folded players gave up somewhere below it
+    players = [Player(str(i), rng.randint(1, 200)) for i in range(rng.randint(2, 9))]
+    Table.seat(players)
+    pot = Pot(players)
+    level = rng.randint(1, 200)
+    folded = set(rng.sample(players, rng.randint(0, len(players) - 2))) if folds else ()
+    for player in players:
+        stack = player.money
+        amount = (
+            rng.randint(0, min(stack - 1, level))
+            if player in folded
+            else min(stack, level)
+        )
+        player.money = stack - amount
+        pot.add(player, amount)
+        if player in folded:
+            pot.fold(player)
+    contenders = [player for player in players if player not in folded]
+    if ties:
+        strengths = {player: rng.randrange(3) for player in contenders}
+    else:
+        strengths = dict(zip(contenders, rng.sample(range(1000), len(contenders))))
+    return pot, contenders, strengths
+
+
+def test_simple_pots_match_split_money():
+    # Where the old code was right: no folded chips, no ties and one short all-in
+    # at most, since it capped later winners by their whole bet, not a layer
+    rng = random.Random(11)
+    checked = 0
+    while checked < 5000:
+        pot, contenders, strengths = all_in_scenario(rng, folds=False, ties=False)
+        contributions = dict(pot.contributions.items())
+        top = max(contributions.values())
+        if sum(amount < top for amount in contributions.values()) > 1:
+            continue
+        checked += 1
+        assert pot.payouts(strengths) == old_split_money(
+            contributions, contenders, strengths
+        )
+
+
+def test_single_layer_pots_match_split_money():
+    rng = random.Random(12)
+    for _ in range(2000):
+        players = [Player(str(i), 1000) for i in range(rng.randint(2, 9))]
+        Table.seat(players)
+        pot = Pot(players)
+        bet = rng.randint(1, 500)
+        for player in players:
+            player.money -= bet
+            pot.add(player, bet)
+        strengths = {player: rng.random() for player in players}
+        assert pot.payouts(strengths) == old_split_money(
+            dict(pot.contributions.items()), players, strengths
+        )
+
+
+def test_random_all_ins_follow_the_layer_rules():
+    rng = random.Random(13)
+    for _ in range(20000):
+        pot, contenders, strengths = all_in_scenario(rng)
+        payouts = pot.payouts(strengths)
+        contributions = pot.contributions
+        top = max(contributions[player] for player in contenders)
+        overflow = sum(max(c - top, 0) for c in contributions.values())
+
+        def reachable(player):
+            # Chips a player's bet can win: up to its own level from everyone,
+            # plus folded chips above the last level for whoever reaches it
+            level = contributions[player]
+            won = sum(min(c, level) for c in contributions.values())
+            return won + (overflow if level == top else 0)
+
+        assert sum(payouts.values()) == pot.total
+        assert set(payouts) <= set(contenders)
+        for player, amount in payouts.items():
+            assert amount <= reachable(player)
+
+        best = max(strengths.values())
+        winners = [player for player in contenders if strengths[player] == best]
+        if len(winners) == 1:
+            assert payouts[winners[0]] == reachable(winners[0])
+        layers = len(pot.layers())
+        for i, first in enumerate(winners):
+            for second in winners[i + 1 :]:
+                if contributions[first] == contributions[second]:
+                    # Odd chips go to the earliest winner of each layer
+                    difference = payouts[first] - payouts[second]
+                    assert 0 <= difference <= layers
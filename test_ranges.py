@@ -0,0 +1,90 @@
+from itertools import combinations
+from math import comb
+import pytest
+from equity import exact_equity
+from evaluator import evaluate7
+from poker import Poker
+from ranges import canonical_classes, canonical_subsets, parse_range, stabilizer
+
+
+def test_starting_hand_classes():
+    classes = list(canonical_classes())
+    assert len(classes) == 169
+    assert sum(count for _, _, count in classes) == comb(52, 2)
+
+
+@pytest.mark.parametrize("hole", [["A♠", "A♣"], ["A♠", "K♠"], ["A♠", "K♣"]])
+def test_flop_orbits_cover_every_flop(hole):
+    hole = Poker.encode(hole)
+    rest = [card for card in range(52) if card not in hole]
+    orbits = canonical_subsets(rest, 3, stabilizer(hole))
+    assert sum(count for _, count in orbits) == comb(50, 3)
+
+
+@pytest.mark.parametrize(
+    "text, combos",
+    [
+        ("TT+", 30),
+        ("AKs", 4),
+        ("76o", 12),
+        ("A5s-A2s", 16),
+        ("AK", 16),
+        ("22-44", 18),
+        ("KTs+", 12),
+        ("AhKh", 1),
+        ("AKs, AhKh, 76o", 16),
+    ],
+)
+def test_combo_counts(text, combos):
+    assert len(parse_range(text)) == combos
+
+
+def test_weights():
+    hand_range = parse_range("AKs:0.5, AhKh")
+    assert sorted(hand_range.values()) == [0.5, 0.5, 0.5, 1.0]
+
+
+@pytest.mark.parametrize(
+    "token", ["AKx", "AAs", "AhAh", "A5s-A2o", "A5s-K2s", "AZ", "AK:x", "AKs+-"]
+)
+def test_malformed_tokens(token):
+    with pytest.raises(ValueError):
+        parse_range(token)
+
+
+def plain_equity(hands, board, opponents=0):
+    # Every runout and opponent hand once, without any suit symmetry
+    hands = [Poker.encode(hand) for hand in hands]
+    board = Poker.encode(board)
+    deck = [card for card in range(52) if card not in board + sum(hands, [])]
+    shares, samples = [0.0] * len(hands), 0
+    for runout in combinations(deck, 5 - len(board)):
+        full_board = board + list(runout)
+        rest = [card for card in deck if card not in runout]
+        for others in combinations(rest, 2) if opponents else [()]:
+            strengths = [evaluate7(hand + full_board) for hand in hands]
+            if others:
+                strengths.append(evaluate7(list(others) + full_board))
+            best = max(strengths)
+            for seat, hand in enumerate(hands):
+                if strengths[seat] == best:
+                    shares[seat] += 1 / strengths.count(best)
+            samples += 1
+    return [share / samples for share in shares], samples
+
+
+@pytest.mark.parametrize(
+    "hands, board, opponents",
+    [
+        # Swapping spades and clubs fixes both hands and the board
+        ([["A♠", "A♣"], ["K♥", "K♦"]], ["2♦", "7♦", "9♥"], 0),
+        ([["A♠", "A♣"]], ["2♦", "7♦", "9♥", "3♥"], 1),
+    ],
+)
+def test_symmetric_exact_equity_matches_plain_enumeration(hands, board, opponents):
+    encoded = [Poker.encode(hand) for hand in hands]
+    assert len(stabilizer(Poker.encode(board), *encoded)) > 1
+    results = exact_equity(hands, board=board, opponents=opponents)
+    equities, samples = plain_equity(hands, board, opponents)
+    assert [result.samples for result in results] == [samples] * len(hands)
+    assert [result.equity for result in results] == pytest.approx(equities)
@@ -0,0 +1,40 @@
+import random
+import pytest
+from game import Game
+from observer import Observer
+from player import Player
+from poker import Deck
+from strategy import CallingStation, RandomStrategy
+from variant import FIVE_CARD_DRAW, POT_LIMIT_OMAHA
+
+STRATEGIES = (RandomStrategy, CallingStation)
+
+
+class PotCheck(Observer):
+    def __init__(self):
+        self.rounds = 0
+
+    def round_started(self, round):
+        self.chips = sum(player.money for player in round.players)
+
+    def pot_awarded(self, round, payouts):
+        assert sum(payouts.values()) == round.pot.total
+        assert sum(player.money for player in round.players) == self.chips
+        self.rounds += 1
+
+
+@pytest.mark.parametrize("variant", [POT_LIMIT_OMAHA, FIVE_CARD_DRAW])
+@pytest.mark.parametrize("seed", range(50))
+def test_games_conserve_chips(variant, seed):
+    rng = random.Random(seed)
+    players = [
+        Player(str(i), rng.choice((200, 1000)), rng.choice(STRATEGIES)(seed * 10 + i))
+        for i in range(2 + seed % 5)
+    ]
+    check = PotCheck()
+    game = Game(players, headless=True, observers=[check], variant=variant)
+    game.deck = Deck(rng=random.Random(seed))
+    chips = sum(player.money for player in players)
+    game.play(max_rounds=50)
+    assert sum(player.money for player in players) == chips
+    assert check.rounds == game.rounds_played > 0
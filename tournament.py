@@ -0,0 +1,187 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from blinds import BlindSchedule
+from game import Game
+from player import Player
+from poker import Deck
+from strategy import CallingStation, RandomStrategy
+
+
+def play_tables(tables, small_blind, hands, strategies, seed):
+    # Each table is a list of (entrant, stack, strategy index) with the dealer first
+    results = []
+    for number, table in enumerate(tables):
+        table_seed = seed * 100003 + number
+        players = [
+            Player(
+                str(entrant), stack, strategies[kind](seed=table_seed * 31 + entrant)
+            )
+            for entrant, stack, kind in table
+        ]
+        game = Game(
+            players,
+            initial_small_blind=small_blind,
+            headless=True,
+            blind_schedule=BlindSchedule([small_blind], hands_per_level=1),
+        )
+        game.deck = Deck(rng=Random(table_seed))
+        start = time.perf_counter()
+        game.play(max_rounds=hands)
+        elapsed = time.perf_counter() - start
+        stacks = [
+            (entrant, player.money) for (entrant, _, _), player in zip(table, players)
+        ]
+        dealer = players.index(game.dealer)
+        # Rotated so the next hand's dealer sits first again
+        results.append((stacks[dealer:] + stacks[:dealer], game.rounds_played, elapsed))
+    return results
+
+
+def _next_big_blind(table):
+    return table.pop(2 % len(table))
+
+
+def rebalance(tables, seats):
+    # Breaks the shortest tables until just enough are left, then moves one player
+    # at a time from the longest to the shortest until they differ by at most one
+    tables = [table for table in tables if table]
+    needed = -(-sum(len(table) for table in tables) // seats)
+    broken, moved = 0, 0
+    while len(tables) > needed:
+        shortest = min(tables, key=len)
+        tables.remove(shortest)
+        broken += 1
+        for entrant in shortest:
+            min(tables, key=len).append(entrant)
+            moved += 1
+    while tables:
+        longest, shortest = max(tables, key=len), min(tables, key=len)
+        if len(longest) - len(shortest) <= 1:
+            break
+        shortest.append(_next_big_blind(longest))
+        moved += 1
+    return tables, broken, moved
+
+
+def run_tournament(
+    entrants=10000,
+    strategies=(RandomStrategy, CallingStation),
+    seats=9,
+    money=1000,
+    schedule=None,
+    hands_per_step=10,
+    workers=None,
+    chunks_per_worker=4,
+    seed=0,
+):
+    schedule = schedule or BlindSchedule.doubling(10, hands_per_level=30)
+    workers = workers or os.cpu_count()
+    kinds = [entrant % len(strategies) for entrant in range(entrants)]
+    stacks = dict.fromkeys(range(entrants), money)
+    order = list(stacks)
+    Random(seed).shuffle(order)
+    count = -(-entrants // seats)
+    tables = [order[number::count] for number in range(count)]
+
+    busted = []
+    hands = table_hands = steps = broken = moved = 0
+    table_seconds = 0.0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while len(stacks) > 1:
+            small_blind = schedule.small_blind(
+                hands=steps * hands_per_step, seconds=time.perf_counter() - start
+            )
+            step = -(-len(tables) // (workers * chunks_per_worker))
+            chunks = [tables[i : i + step] for i in range(0, len(tables), step)]
+            futures = [
+                executor.submit(
+                    play_tables,
+                    [
+                        [
+                            (entrant, stacks[entrant], kinds[entrant])
+                            for entrant in table
+                        ]
+                        for table in chunk
+                    ],
+                    small_blind,
+                    hands_per_step,
+                    strategies,
+                    seed * 1000003 + steps * len(chunks) + number,
+                )
+                for number, chunk in enumerate(chunks)
+            ]
+
+            tables, out = [], []
+            for future in futures:
+                for table, played, elapsed in future.result():
+                    hands += played
+                    table_hands += played
+                    table_seconds += elapsed
+                    tables.append([entrant for entrant, _ in table])
+                    for entrant, stack in table:
+                        if stack:
+                            stacks[entrant] = stack
+                        else:
+                            out.append(entrant)
+            # Players busting in the same step are placed by their stack before it
+            out.sort(key=lambda entrant: -stacks.pop(entrant))
+            busted.extend(reversed(out))
+            tables = [
+                [entrant for entrant in table if entrant in stacks] for table in tables
+            ]
+            tables, step_broken, step_moved = rebalance(tables, seats)
+            broken += step_broken
+            moved += step_moved
+            steps += 1
+    elapsed = time.perf_counter() - start
+
+    places = list(stacks) + busted[::-1]
+    assert sum(stacks.values()) == entrants * money
+    return {
+        "entrants": entrants,
+        "winner": (places[0], strategies[kinds[places[0]]].__name__),
+        "places": places,
+        "steps": steps,
+        "level": schedule.level(hands=steps * hands_per_step, seconds=elapsed),
+        "tables_broken": broken,
+        "players_moved": moved,
+        "hands": hands,
+        "seconds": elapsed,
+        "hands_per_second": hands / elapsed,
+        "hands_per_second_per_table": table_hands / table_seconds,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless multi-table tournament")
+    parser.add_argument("--entrants", type=int, default=10000)
+    parser.add_argument("--seats", type=int, default=9)
+    parser.add_argument("--money", type=int, default=1000)
+    parser.add_argument("--small-blind", type=int, default=10)
+    levels = parser.add_mutually_exclusive_group()
+    levels.add_argument("--hands-per-level", type=int, default=30)
+    levels.add_argument("--seconds-per-level", type=float, default=None)
+    parser.add_argument("--hands-per-step", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    results = run_tournament(
+        entrants=arguments.entrants,
+        seats=arguments.seats,
+        money=arguments.money,
+        schedule=BlindSchedule.doubling(
+            arguments.small_blind,
+            hands_per_level=arguments.hands_per_level,
+            seconds_per_level=arguments.seconds_per_level,
+        ),
+        hands_per_step=arguments.hands_per_step,
+        workers=arguments.workers,
+        seed=arguments.seed,
+    )
+    del results["places"]
+    print(results)
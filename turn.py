@@ -1,5 +1,7 @@
 from player import Player, Action
 from poker import Poker
+from table import SeatArray
+from collections import Counter
 from enum import Enum
 
 
@@ -14,14 +16,46 @@ class TexasHoldEmTurn(Enum):
     FLOP = "flop"
     TURN = "turn"
     RIVER = "river"
+    DRAW = "draw"
 
 
 class PokerTurn:
+    __slots__ = (
+        "name",
+        "status",
+        "bets",
+        "title",
+        "observers",
+        "pot",
+        "pot_limit",
+        "deck",
+        "players",
+        "first_player",
+        "current_player",
+        "shared_cards",
+        "seats",
+        "turn_bet",
+        "in_game_count",
+        "bet_counts",
+        "all_in",
+        "calling_players",
+        "active",
+        "next_seat",
+        "previous_seat",
+    )
+
     def __init__(self, name):
         self.name = name
         self.status = Status.UPCOMING
-        self.bets = {}
+        self.bets = SeatArray([])
         self.title = name
+        self.observers = []
+        self.pot = None
+        self.pot_limit = False
+
+    def notify(self, event, *args):
+        for observer in self.observers:
+            getattr(observer, event)(*args)
 
     def start(self, players, deck, first_player):
         self.deck = deck
@@ -29,32 +63,39 @@ class PokerTurn:
         assert first_player in players
         self.first_player = first_player
         self.status = Status.ONGOING
-        self.bets = {player: 0 for player in self.players}
+        self.bets = SeatArray(self.players)
         self.current_player = self.first_player
-        self.calling_players = set()
 
-        print(self)
+        self.seats = {player: seat for seat, player in enumerate(self.players)}
+        self.turn_bet = 0
+        in_game = self.in_game_players()
+        self.in_game_count = len(in_game)
+        self.bet_counts = Counter({0: len(in_game)})
+        self.all_in = {p for p in in_game if p.is_all_in()}
+        self.calling_players = set(self.all_in)
+
+        # Circular doubly linked ring over the seats still able to act
+        self.active = [p.has_cards() and not p.is_all_in() for p in self.players]
+        seats = [seat for seat, active in enumerate(self.active) if active]
+        self.next_seat = list(range(1, len(players))) + [0]
+        self.previous_seat = [len(players) - 1] + list(range(len(players) - 1))
+        for i, seat in enumerate(seats):
+            self.next_seat[seat] = seats[(i + 1) % len(seats)]
+            self.previous_seat[seat] = seats[i - 1]
+
+        self.notify("turn_started", self)
 
     def end(self):
         self.status = Status.COMPLETED
 
     def get_bet(self):
-        return max(bet for player, bet in self.bets.items())
+        return self.turn_bet
 
     def in_game_players(self):
-        return [player for player in self.players if player.cards]
+        return [player for player in self.players if player.has_cards()]
 
     def is_even(self):
-        return (
-            len(
-                {
-                    bet
-                    for player, bet in self.bets.items()
-                    if player in self.in_game_players()
-                }
-            )
-            == 1
-        )
+        return len(self.bet_counts) == 1
 
     def playing_players(self):
         return [p for p in self.in_game_players() if not p.is_all_in()]
@@ -63,19 +104,60 @@ class PokerTurn:
         return [p for p in self.in_game_players() if p.is_all_in()]
 
     def is_completed(self):
-        are_all_players_calling = set(self.in_game_players()) == self.calling_players
+        are_all_players_calling = len(self.calling_players) == self.in_game_count
         are_all_bets_even = self.is_even()
         return are_all_players_calling or (
-            are_all_bets_even and len(self.playing_players()) < 2
+            are_all_bets_even and self.in_game_count - len(self.all_in) < 2
         )
 
+    def _deactivate(self, player):
+        seat = self.seats[player]
+        if not self.active[seat]:
+            return
+        self.active[seat] = False
+        previous, following = self.previous_seat[seat], self.next_seat[seat]
+        self.next_seat[previous] = following
+        self.previous_seat[following] = previous
+
+    def _set_bet(self, player, bet):
+        self.bet_counts[self.bets[player]] -= 1
+        if not self.bet_counts[self.bets[player]]:
+            del self.bet_counts[self.bets[player]]
+        self.bets[player] = bet
+        self.bet_counts[bet] += 1
+        self.turn_bet = max(self.turn_bet, bet)
+
+    def place_bet(self, player, amount):
+        self._set_bet(player, self.bets[player] + amount)
+        self.pot.add(player, amount)
+        if player.is_all_in() and player not in self.all_in:
+            self.all_in.add(player)
+            self.calling_players.add(player)
+            self._deactivate(player)
+
+    def fold(self, player):
+        self.bet_counts[self.bets[player]] -= 1
+        if not self.bet_counts[self.bets[player]]:
+            del self.bet_counts[self.bets[player]]
+        self.in_game_count -= 1
+        self.calling_players.discard(player)
+        self._deactivate(player)
+        self.pot.fold(player)
+
+    def raise_limit(self, player):
+        # Under pot limit a bet or raise may add at most the pot after calling
+        if not self.pot_limit:
+            return None
+        return self.pot.total + self.turn_bet - self.bets[player]
+
     def do(self, action, player=None):
         player = player or self.current_player
         turn_bet = self.get_bet()
-        bet = player.do(action, turn_bet, self.bets[player])
+        bet = player.do(action, turn_bet, self.bets[player], self.raise_limit(player))
         if bet is None:
-            print("Unavailable action, try again")
+            self.notify("action_rejected", player, action)
             return
+        self.notify("action_taken", player, action, bet)
 
         all_in_call = action == Action.ALL_IN and self.bets[player] + bet <= turn_bet
 
@@ -87,26 +169,25 @@ class PokerTurn:
             Action.BET,
             Action.ALL_IN,
         ]:
-            self.bets[player] += bet
+            self.place_bet(player, bet)
+        if action == Action.FOLD:
+            self.fold(player)
 
         if self.bets[player] > turn_bet:
-            self.calling_players = set([player] + self.all_in_players())
+            self.calling_players = {player} | self.all_in
         self.finish_player_turn()
 
     def finish_player_turn(self):
         self.current_player = self.next_player()
 
     def next_player(self):
-        in_game_players_and_current = [
-            player
-            for player in self.players
-            if player == self.current_player
-            or (player.cards and not player.is_all_in())
-        ]
-        return in_game_players_and_current[
-            (in_game_players_and_current.index(self.current_player) + 1)
-            % len(in_game_players_and_current)
-        ]
+        # Seats removed from the ring keep their pointers, so follow them forward
+        seat = self.seats[self.current_player]
+        for _ in range(len(self.players)):
+            seat = self.next_seat[seat]
+            if self.active[seat]:
+                return self.players[seat]
+        return self.current_player
 
     def __str__(self):
         info = ": ".join(
@@ -116,9 +197,19 @@ class PokerTurn:
 
 
 class Blind(PokerTurn):
-    def __init__(self, small_blind=10):
+    __slots__ = (
+        "small_blind",
+        "dealer",
+        "small_blind_player",
+        "big_blind_player",
+        "big_blind",
+        "hole_cards",
+    )
+
+    def __init__(self, small_blind=10, hole_cards=2):
         super().__init__(TexasHoldEmTurn.BLIND)
         self.small_blind = small_blind
+        self.hole_cards = hole_cards
         self.title = "Place your bets!"
 
     def start(self, players, deck, dealer):
@@ -133,50 +224,82 @@ class Blind(PokerTurn):
         self.big_blind_player = players[big_blind_player_idx]
         self.big_blind = 2 * self.small_blind
 
-        rest_of_the_deck = Poker.deal(players, deck=deck)
+        Poker.deal(players, player_cards=self.hole_cards, deck=deck)
 
         first_player = players[(big_blind_player_idx + 1) % len(players)]
         self.shared_cards = []
-        super().start(players, rest_of_the_deck, first_player=first_player)
+        super().start(players, deck, first_player=first_player)
 
-        self.bets[self.small_blind_player] += self.small_blind_player.bet(
-            self.small_blind
-        )
-        self.bets[self.big_blind_player] += self.big_blind_player.bet(self.big_blind)
-        return self.shared_cards, rest_of_the_deck
+        for player, blind in [
+            (self.small_blind_player, self.small_blind),
+            (self.big_blind_player, self.big_blind),
+        ]:
+            self.place_bet(player, player.bet(blind))
+        return self.shared_cards, deck
 
 
 class Flop(PokerTurn):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TexasHoldEmTurn.FLOP)
         self.title = "The Flop"
 
     def start(self, players, deck, first_player):
-        deck.pop(0)  # Discard one
-        self.shared_cards, rest_of_the_deck = deck[:3], deck[3:]
+        deck.burn()
+        self.shared_cards = deck.deal(3)
         super().start(players, deck, first_player=first_player)
-        return self.shared_cards, rest_of_the_deck
+        return self.shared_cards, deck
 
 
 class Turn(PokerTurn):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TexasHoldEmTurn.TURN)
         self.title = "The Turn"
 
     def start(self, players, deck, first_player):
-        deck.pop(0)  # Discard one
-        self.shared_cards = [deck.pop(0)]
+        deck.burn()
+        self.shared_cards = [deck.draw()]
         super().start(players, deck, first_player=first_player)
         return self.shared_cards, deck
 
 
 class River(PokerTurn):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(TexasHoldEmTurn.RIVER)
         self.title = "And the River!"
 
     def start(self, players, deck, first_player):
-        deck.pop(0)  # Discard one
-        self.shared_cards = [deck.pop(0)]
+        deck.burn()
+        self.shared_cards = [deck.draw()]
+        super().start(players, deck, first_player=first_player)
+        return self.shared_cards, deck
+
+
+class Draw(PokerTurn):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(TexasHoldEmTurn.DRAW)
+        self.title = "The Draw"
+
+    def start(self, players, deck, first_player):
+        first = players.index(first_player)
+        for player in players[first:] + players[:first]:
+            if not player.has_cards():
+                continue
+            card_ids = list(player.card_ids)
+            discards = {
+                i for i in player.strategy.discard(player) if 0 <= i < len(card_ids)
+            }
+            # Without a reshuffle of the discards the deck can run out
+            discards = sorted(discards)[: len(deck)]
+            kept = [card for i, card in enumerate(card_ids) if i not in discards]
+            player.card_ids = kept + [deck.draw_id() for _ in discards]
+        self.shared_cards = []
         super().start(players, deck, first_player=first_player)
         return self.shared_cards, deck
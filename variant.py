@@ -0,0 +1,20 @@
+from collections import namedtuple
+from evaluator import evaluate, evaluate_omaha
+from turn import Draw, Flop, River, Turn
+
+# streets are the turn classes played after the blinds and the deal
+Variant = namedtuple(
+    "Variant", ["name", "hole_cards", "streets", "evaluate", "pot_limit"]
+)
+
+HOLD_EM = Variant("Texas Hold'em", 2, (Flop, Turn, River), evaluate, False)
+FIVE_CARD_DRAW = Variant("Five-card draw", 5, (Draw,), evaluate, False)
+POT_LIMIT_OMAHA = Variant(
+    "Pot-Limit Omaha", 4, (Flop, Turn, River), evaluate_omaha, True
+)
+
+VARIANTS = {
+    "holdem": HOLD_EM,
+    "draw": FIVE_CARD_DRAW,
+    "plo": POT_LIMIT_OMAHA,
+}